@@ -0,0 +1,64 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+"""
+Measure cold-start import time of the package in fresh interpreters.
+
+Usage:
+    python -m benchmarks.import_benchmark --runs 10
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Importing pydantic itself; BaseModel is resolved since pydantic loads it lazily. Budgets are relative to this.
+PYDANTIC_BASELINE = "import pydantic; pydantic.BaseModel"
+
+STATEMENTS = [
+    PYDANTIC_BASELINE,
+    "import jgib",
+    "import jgib.websocket.models",
+    "from jgib.websocket.models import TickerList",
+    "from jgib.websocket import WebSocketClient",
+    "from jgib.websocket import *",
+]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "modules": sorted(sys.modules)}}))
+"""
+
+
+def measureImport(statement: str, runs: int = 5):
+    """Run the import statement in `runs` fresh interpreters. Returns (median ms, modules loaded by the last run)."""
+    env = dict(
+        os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", "")
+    )
+    times = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(statement=statement)],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=env,
+        ).stdout
+        result = json.loads(output)
+        times.append(result["ms"])
+    return statistics.median(times), set(result["modules"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import-time benchmark")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    for statement in STATEMENTS:
+        ms, modules = measureImport(statement, args.runs)
+        heavy = [m for m in ("pydantic", "websockets", "jgmd") if m in modules]
+        print(f"{ms:8.1f} ms  {statement:<48} loads: {', '.join(heavy) or '-'}")
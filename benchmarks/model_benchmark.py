@@ -0,0 +1,325 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+from jgib.websocket.models import (
+    BarDto,
+    BarList,
+    Channel,
+    IbClientCommandDto,
+    IbClientCommandType,
+    IbClientDataRequestDto,
+    IbClientDataRequestType,
+    IbClientEventDto,
+    IbClientEventType,
+    QualifiedContractChunk,
+    QualifiedContractDto,
+    QualifiedContractList,
+    QualifiedContractsVersionDto,
+    SubscriptionAction,
+    SubscriptionDto,
+    TickerDeltaDto,
+    TickerDeltaList,
+    TickerDto,
+    TickerList,
+)
+
+"""
+Serialization microbenchmarks for every model in jgib.websocket.models, with stored baselines.
+
+For each model and size, four operations are measured (time per batch and peak traced memory):
+    construct       build the model(s) from Python objects
+    dump_json       model_dump_json
+    validate_json   model_validate_json
+    dict_round_trip model_validate(model_dump())
+For list models (TickerList, QualifiedContractList, ...) the size is the number of elements in one message; for scalar
+DTOs it is the number of messages in the batch.
+
+Usage:
+    python -m benchmarks.model_benchmark                     # compare against the baseline
+    python -m benchmarks.model_benchmark --update-baseline   # record a new baseline
+    python -m benchmarks.model_benchmark --threshold 0.5     # allow 50% regressions
+
+Exits with status 1 if any measurement regresses past the threshold. Baselines are machine-specific: record them on
+the machine that runs the comparison.
+"""
+
+SIZES = [1, 100, 1_000, 10_000]
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "models.json")
+DEFAULT_THRESHOLD = float(os.environ.get("JGIB_BENCH_THRESHOLD", 0.25))
+# Differences below these are noise, whatever the relative change
+MIN_SECONDS_DELTA = 50e-6
+MIN_BYTES_DELTA = 4096
+MIN_REPEAT_SECONDS = 0.01
+
+
+def _ticker(i: int) -> TickerDto:
+    return TickerDto(
+        conId=i, symbol=f"SYM{i}", last=100.0 + i, startPrice=99.0, pctDeviation=0.01
+    )
+
+
+def _contract(i: int) -> QualifiedContractDto:
+    return QualifiedContractDto(
+        conId=i,
+        symbol=f"SYM{i}",
+        secType="OPT",
+        exchange="SMART",
+        multiplier=100,
+        monthOfContract="202612",
+        tickSize=0.01,
+        watchlist="options",
+    )
+
+
+def _bar(i: int) -> BarDto:
+    return BarDto(conId=i, open=1.0, high=2.0, low=0.5, close=1.5, count=10)
+
+
+# Model name -> (model class, size -> list of constructor kwargs, one per message in the batch)
+CASES: Dict[str, Tuple[type, Callable[[int], List[Dict]]]] = {
+    "TickerDto": (TickerDto, lambda n: [vars(_ticker(i)) for i in range(n)]),
+    "TickerList": (
+        TickerList,
+        lambda n: [
+            {"channel": Channel.Data.Tickers, "tickers": [_ticker(i) for i in range(n)]}
+        ],
+    ),
+    "TickerDeltaDto": (
+        TickerDeltaDto,
+        lambda n: [{"conId": i, "last": 100.0 + i} for i in range(n)],
+    ),
+    "TickerDeltaList": (
+        TickerDeltaList,
+        lambda n: [
+            {
+                "channel": Channel.Data.TickerDeltas,
+                "sequence": 1,
+                "keyframe": False,
+                "tickers": [TickerDeltaDto(conId=i, last=100.0 + i) for i in range(n)],
+            }
+        ],
+    ),
+    "QualifiedContractDto": (
+        QualifiedContractDto,
+        lambda n: [vars(_contract(i)) for i in range(n)],
+    ),
+    "QualifiedContractList": (
+        QualifiedContractList,
+        lambda n: [
+            {
+                "channel": Channel.Data.Contracts,
+                "contracts": [_contract(i) for i in range(n)],
+            }
+        ],
+    ),
+    "QualifiedContractChunk": (
+        QualifiedContractChunk,
+        lambda n: [
+            {
+                "channel": Channel.Data.Contracts,
+                "transferId": "0" * 32,
+                "chunkIndex": 0,
+                "totalChunks": 1,
+                "contracts": [_contract(i) for i in range(n)],
+            }
+        ],
+    ),
+    "QualifiedContractsVersionDto": (
+        QualifiedContractsVersionDto,
+        lambda n: [{"channel": Channel.Data.ContractsVersion, "version": "0" * 16}] * n,
+    ),
+    "BarDto": (BarDto, lambda n: [vars(_bar(i)) for i in range(n)]),
+    "BarList": (
+        BarList,
+        lambda n: [
+            {
+                "channel": Channel.Data.Bars1m,
+                "start": 0.0,
+                "interval": 60,
+                "bars": [_bar(i) for i in range(n)],
+            }
+        ],
+    ),
+    "IbClientEventDto": (
+        IbClientEventDto,
+        lambda n: [
+            {"channel": Channel.Event.IbClient, "event": IbClientEventType.CONNECTED}
+        ]
+        * n,
+    ),
+    "IbClientCommandDto": (
+        IbClientCommandDto,
+        lambda n: [
+            {
+                "channel": Channel.Command.IbClient,
+                "command": IbClientCommandType.RESET_START_PRICES,
+            }
+        ]
+        * n,
+    ),
+    "IbClientDataRequestDto": (
+        IbClientDataRequestDto,
+        lambda n: [
+            {
+                "channel": Channel.Request.IbClient,
+                "request": IbClientDataRequestType.CONTRACTS,
+            }
+        ]
+        * n,
+    ),
+    "SubscriptionDto": (
+        SubscriptionDto,
+        lambda n: [
+            {"action": SubscriptionAction.SUBSCRIBE.value, "channel": "dat@tickers"}
+        ]
+        * n,
+    ),
+}
+
+
+def _operations(
+    modelClass: type, payloads: List[Dict]
+) -> Dict[str, Callable[[], object]]:
+    models = [modelClass(**payload) for payload in payloads]
+    jsons = [model.model_dump_json() for model in models]
+    return {
+        "construct": lambda: [modelClass(**payload) for payload in payloads],
+        "dump_json": lambda: [model.model_dump_json() for model in models],
+        "validate_json": lambda: [modelClass.model_validate_json(j) for j in jsons],
+        "dict_round_trip": lambda: [
+            modelClass.model_validate(model.model_dump()) for model in models
+        ],
+    }
+
+
+def _measure(operation: Callable[[], object], repeat: int) -> Dict:
+    # Calibrate so each timed repeat runs for at least MIN_REPEAT_SECONDS; take the best repeat
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            operation()
+        if time.perf_counter() - start >= MIN_REPEAT_SECONDS:
+            break
+        loops *= 2
+    best = float("inf")
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(loops):
+                operation()
+            best = min(best, (time.perf_counter() - start) / loops)
+    finally:
+        gc.enable()
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "peakBytes": peak}
+
+
+def run(
+    models: Optional[List[str]] = None, sizes: List[int] = SIZES, repeat: int = 5
+) -> Dict[str, Dict]:
+    """Run the benchmarks. Returns {"<model>/<size>/<operation>": {"seconds", "peakBytes"}}."""
+    results = {}
+    for name in models or CASES:
+        modelClass, payloadFactory = CASES[name]
+        for size in sizes:
+            for operation, fn in _operations(modelClass, payloadFactory(size)).items():
+                results[f"{name}/{size}/{operation}"] = _measure(fn, repeat)
+    return results
+
+
+def compare(
+    results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float
+) -> List[str]:
+    """Return a description of every measurement that is more than threshold (e.g. 0.25 = 25%) worse than baseline."""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for metric, minDelta in (
+            ("seconds", MIN_SECONDS_DELTA),
+            ("peakBytes", MIN_BYTES_DELTA),
+        ):
+            limit = previous[metric] * (1 + threshold)
+            if (
+                current[metric] > limit
+                and current[metric] - previous[metric] > minDelta
+            ):
+                regressions.append(
+                    f"{key} {metric}: {current[metric]:.6g} vs baseline {previous[metric]:.6g} "
+                    f"(+{(current[metric] / previous[metric] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def check(
+    results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float, repeat: int
+) -> List[str]:
+    """
+    Compare results with the baseline, re-measuring suspected regressions once so a single noisy measurement does not
+    fail the check. Returns the confirmed regressions.
+    """
+    suspects = {
+        r.split()[0].rsplit("/", 1)[0] for r in compare(results, baseline, threshold)
+    }
+    for suspect in sorted(suspects):
+        name, size = suspect.split("/")
+        for key, rerun in run([name], [int(size)], repeat).items():
+            results[key] = {
+                metric: min(value, rerun[metric])
+                for metric, value in results[key].items()
+            }
+    return compare(results, baseline, threshold)
+
+
+def loadBaseline(path: str = BASELINE_PATH) -> Dict[str, Dict]:
+    with open(path) as file:
+        return json.load(file)["results"]
+
+
+def saveBaseline(results: Dict[str, Dict], path: str = BASELINE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(
+            {"python": sys.version.split()[0], "results": results},
+            file,
+            indent=1,
+            sort_keys=True,
+        )
+        file.write("\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Model serialization benchmarks")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--models", nargs="*", default=list(CASES))
+    parser.add_argument("--sizes", nargs="*", type=int, default=SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = run(args.models, args.sizes, args.repeat)
+    for key, result in results.items():
+        print(
+            f"{key:<50}{result['seconds'] * 1e6:>14.1f} us{result['peakBytes'] / 1024:>12.1f} KiB"
+        )
+    if args.update_baseline:
+        saveBaseline(results)
+        print(f"Baseline written to {BASELINE_PATH}")
+        sys.exit(0)
+    regressions = check(results, loadBaseline(), args.threshold, args.repeat)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from jgmd.logging import FreeTextLogger, LogLevel
+from jgib.websocket import (
+    WebSocketClient,
+    WebSocketServer,
+    Channel,
+    TickerDto,
+    TickerList,
+)
+
+"""
+Compare loopback TCP against a Unix domain socket for the publisher -> server -> subscriber path.
+
+Latency is measured one message at a time (publisher waits for the subscriber to receive each one).
+Throughput is measured by publishing a burst and timing until the subscriber has received all of it.
+
+Usage:
+    python -m benchmarks.transport_benchmark --messages 2000 --tickers 50
+"""
+
+TOKEN = "benchmark"
+
+
+async def runTransport(label: str, connectKwargs: dict, messages: int, tickers: int):
+    logger = FreeTextLogger(
+        tempfile.gettempdir(), "jgib_benchmark.log", LogLevel.INFO, printToConsole=False
+    )
+    payload = TickerList.create(
+        [TickerDto(conId=i, symbol=f"SYM{i}", last=100.0 + i) for i in range(tickers)]
+    )
+    received = asyncio.Queue()
+
+    subscriber = WebSocketClient(logger, f"{label}_subscriber")
+    publisher = WebSocketClient(logger, f"{label}_publisher")
+    await subscriber.connect(token=TOKEN, **connectKwargs)
+    await publisher.connect(token=TOKEN, **connectKwargs)
+    subscriber.registerMessageHandlers(
+        {Channel.Data.Tickers: lambda data: received.put_nowait(time.perf_counter())}
+    )
+    await subscriber.subscribeToChannel(Channel.Data.Tickers)
+    await asyncio.sleep(0.1)
+
+    latencies = []
+    for _ in range(messages):
+        start = time.perf_counter()
+        await publisher.send(payload)
+        latencies.append(await received.get() - start)
+
+    start = time.perf_counter()
+    for _ in range(messages):
+        await publisher.send(payload)
+    for _ in range(messages):
+        await received.get()
+    elapsed = time.perf_counter() - start
+
+    await publisher.close()
+    await subscriber.close()
+    return {
+        "transport": label,
+        "p50_us": statistics.median(latencies) * 1e6,
+        "p99_us": sorted(latencies)[int(len(latencies) * 0.99) - 1] * 1e6,
+        "msgs_per_s": messages / elapsed,
+    }
+
+
+async def main(messages: int, tickers: int, port: int):
+    logger = FreeTextLogger(
+        tempfile.gettempdir(), "jgib_benchmark.log", LogLevel.INFO, printToConsole=False
+    )
+    unixPath = os.path.join(tempfile.mkdtemp(), "jgib.sock")
+    server = WebSocketServer(logger, secretToken=TOKEN, maxMessagesPerMinute=10**9)
+    serverTask = asyncio.create_task(server.start("localhost", port, unixPath))
+    await asyncio.sleep(0.5)
+    try:
+        results = [
+            await runTransport(
+                "tcp", {"uri": f"ws://localhost:{port}"}, messages, tickers
+            ),
+            await runTransport(
+                "unix",
+                {"uri": "ws://localhost", "unixPath": unixPath},
+                messages,
+                tickers,
+            ),
+        ]
+    finally:
+        serverTask.cancel()
+    print(f"{'transport':<10}{'p50 (us)':>12}{'p99 (us)':>12}{'msgs/s':>12}")
+    for r in results:
+        print(
+            f"{r['transport']:<10}{r['p50_us']:>12.1f}{r['p99_us']:>12.1f}{r['msgs_per_s']:>12.0f}"
+        )
+    tcp, unix = results
+    print(
+        f"unix vs tcp: latency x{tcp['p50_us'] / unix['p50_us']:.2f}, "
+        f"throughput x{unix['msgs_per_s'] / tcp['msgs_per_s']:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TCP vs Unix socket benchmark")
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8799)
+    args = parser.parse_args()
+    asyncio.run(main(args.messages, args.tickers, args.port))
@@ -1 +1,7 @@
-from . import websocket
+from typing import TYPE_CHECKING
+from ._lazy import lazyAttributes
+
+if TYPE_CHECKING:
+    from . import websocket
+
+__getattr__, __dir__ = lazyAttributes(__name__, globals(), {"websocket": None})
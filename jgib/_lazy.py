@@ -0,0 +1,35 @@
+import importlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+"""
+Lazy attribute loading for package __init__ modules (PEP 562). Importing a package only binds the names; the submodule
+that defines a name is imported the first time the name is accessed. Model-only consumers therefore don't pay for
+websockets, jgmd or the server/client code, and `from package import *` still works through __all__.
+"""
+
+
+def lazyAttributes(
+    packageName: str, packageGlobals: Dict, attributes: Dict[str, Optional[str]]
+) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """
+    Build module-level __getattr__ and __dir__ for a package.
+
+    attributes maps each public name to the relative submodule that defines it (e.g. {"TickerDto": ".data"}).
+    A value of None marks the name as a submodule of the package itself.
+    """
+
+    def __getattr__(name: str):
+        if name not in attributes:
+            raise AttributeError(f"module {packageName!r} has no attribute {name!r}")
+        module = attributes[name]
+        if module is None:
+            value = importlib.import_module(f".{name}", packageName)
+        else:
+            value = getattr(importlib.import_module(module, packageName), name)
+        packageGlobals[name] = value  # Later lookups bypass __getattr__
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(packageGlobals) | set(attributes))
+
+    return __getattr__, __dir__
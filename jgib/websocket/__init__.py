@@ -1,2 +1,21 @@
-from .models import *
-from .services import *
+from typing import TYPE_CHECKING
+from .._lazy import lazyAttributes
+from .models import __all__ as _modelNames
+from .services import __all__ as _serviceNames
+
+if TYPE_CHECKING:
+    from .models import *
+    from .services import *
+
+# Re-export everything from models and services; each name is loaded on first use.
+__all__ = _modelNames + _serviceNames
+__getattr__, __dir__ = lazyAttributes(
+    __name__,
+    globals(),
+    {
+        "models": None,
+        "services": None,
+        **{name: ".models" for name in _modelNames},
+        **{name: ".services" for name in _serviceNames},
+    },
+)
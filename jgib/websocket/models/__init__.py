@@ -1,6 +1,36 @@
-from .base import *
-from .data import *
-from .event import *
-from .command import *
-from .request import *
-from .subscription import *
+from typing import TYPE_CHECKING
+from ..._lazy import lazyAttributes
+
+if TYPE_CHECKING:
+    from .base import *
+    from .data import *
+    from .event import *
+    from .command import *
+    from .request import *
+    from .subscription import *
+
+_attributes = {
+    "Channel": ".base",
+    "MessageChannel": ".base",
+    "MessageDto": ".base",
+    "TickerDto": ".data",
+    "TickerList": ".data",
+    "TickerDeltaDto": ".data",
+    "TickerDeltaList": ".data",
+    "QualifiedContractDto": ".data",
+    "QualifiedContractList": ".data",
+    "QualifiedContractChunk": ".data",
+    "QualifiedContractsVersionDto": ".data",
+    "BarDto": ".data",
+    "BarList": ".data",
+    "IbClientEventType": ".event",
+    "IbClientEventDto": ".event",
+    "IbClientCommandType": ".command",
+    "IbClientCommandDto": ".command",
+    "IbClientDataRequestType": ".request",
+    "IbClientDataRequestDto": ".request",
+    "SubscriptionAction": ".subscription",
+    "SubscriptionDto": ".subscription",
+}
+__all__ = list(_attributes)
+__getattr__, __dir__ = lazyAttributes(__name__, globals(), _attributes)
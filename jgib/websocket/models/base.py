@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, ConfigDict, ValidationError
 from enum import Enum
 from typing import Union
 import json
@@ -12,7 +12,12 @@ Define all possible channels and a base class for all messages sent through the
 class Channel:
     class Data(str, Enum):
         Tickers = "dat@tickers"
+        TickerDeltas = "dat@tickers/delta"  # Delta-encoded tickers (TickerDeltaList)
         Contracts = "dat@contracts"
+        ContractsVersion = "dat@contractsVersion"
+        Bars1s = "dat@bars/1s"  # OHLC bars derived from tickers by the server
+        Bars1m = "dat@bars/1m"
+        Bars5m = "dat@bars/5m"
 
     class Command(str, Enum):
         IbClient = "cmd@ibClient"
@@ -32,3 +37,8 @@ MessageChannel = Union[Channel.Command, Channel.Data, Channel.Request, Channel.E
 # Therefore, every message DTO must have a channel attribute.
 class MessageDto(BaseModel):
     channel: MessageChannel
+
+
+# Config for DTOs that are sent rarely (e.g. once at startup). Their validators and serializers are built on first use
+# instead of at import time, which keeps `import jgib.websocket.models` fast.
+DEFERRED_BUILD = ConfigDict(defer_build=True)
@@ -1,5 +1,5 @@
 from enum import Enum
-from .base import Channel, MessageDto
+from .base import Channel, MessageDto, DEFERRED_BUILD
 
 """
 Connected clients can send commands to the ibClient. Commands are used to request specific actions from the ibClient.
@@ -11,6 +11,8 @@ class IbClientCommandType(str, Enum):
 
 
 class IbClientCommandDto(MessageDto):
+    model_config = DEFERRED_BUILD
+
     command: IbClientCommandType
 
     @classmethod
@@ -1,6 +1,9 @@
+import hashlib
+import json
+import uuid
 from typing import Any, List, Set, Optional
-from .base import Channel, MessageDto
-from pydantic import BaseModel
+from .base import Channel, MessageDto, DEFERRED_BUILD
+from pydantic import BaseModel, SerializerFunctionWrapHandler, model_serializer
 
 """
 DTOs for data messages sent through the websocket. For example, tickers and contracts.
@@ -26,7 +29,41 @@ class TickerList(MessageDto):
         )
 
 
+# A TickerDto holding only the fields that changed since the previous frame. Fields that were not set are left out of
+# the JSON, so an unchanged symbol or startPrice costs nothing on the wire.
+class TickerDeltaDto(BaseModel):
+    conId: int
+    symbol: Any = None
+    last: Optional[float] = None
+    startPrice: Optional[float] = None
+    pctDeviation: Optional[float] = None
+
+    @model_serializer(mode="wrap")
+    def _serializeSetFields(self, handler: SerializerFunctionWrapHandler):
+        fieldsSet = self.model_fields_set
+        return {k: v for k, v in handler(self).items() if k in fieldsSet}
+
+
+# Delta-encoded TickerList (see services/tickerDelta.py). A keyframe carries every field of every known conId; other
+# frames carry only the conIds and fields that changed. sequence increases by one per frame so receivers detect gaps.
+class TickerDeltaList(MessageDto):
+    sequence: int
+    keyframe: bool
+    tickers: List[TickerDeltaDto]
+
+    @classmethod
+    def create(cls, sequence: int, keyframe: bool, tickers: List[TickerDeltaDto]):
+        return cls(
+            sequence=sequence,
+            keyframe=keyframe,
+            tickers=tickers,
+            channel=Channel.Data.TickerDeltas,
+        )
+
+
 class QualifiedContractDto(BaseModel):
+    model_config = DEFERRED_BUILD
+
     conId: int
     symbol: str
     secType: str
@@ -38,6 +75,8 @@ class QualifiedContractDto(BaseModel):
 
 
 class QualifiedContractList(MessageDto):
+    model_config = DEFERRED_BUILD
+
     contracts: List[QualifiedContractDto]
 
     @classmethod
@@ -46,3 +85,85 @@ class QualifiedContractList(MessageDto):
             contracts=contracts,
             channel=Channel.Data.Contracts,
         )
+
+    @staticmethod
+    def computeVersion(contracts: List[QualifiedContractDto]) -> str:
+        """Hash of the contract list. Sent in QualifiedContractsVersionDto so clients can validate a cached copy."""
+        payload = json.dumps(
+            [c.model_dump() for c in contracts], sort_keys=True, separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    @classmethod
+    def createChunks(
+        cls, contracts: List[QualifiedContractDto], chunkSize: int = 500
+    ) -> List["QualifiedContractChunk"]:
+        """Split a large contract list into pages that are sent as separate messages (see QualifiedContractChunk)."""
+        transferId = uuid.uuid4().hex
+        totalChunks = max(1, -(-len(contracts) // chunkSize))
+        return [
+            QualifiedContractChunk(
+                transferId=transferId,
+                chunkIndex=i,
+                totalChunks=totalChunks,
+                contracts=contracts[i * chunkSize : (i + 1) * chunkSize],
+                channel=Channel.Data.Contracts,
+            )
+            for i in range(totalChunks)
+        ]
+
+
+# One page of a chunked QualifiedContractList transfer. Pages share a transferId; the client reassembles them into a
+# full QualifiedContractList message, and can also handle each page as it arrives.
+class QualifiedContractChunk(MessageDto):
+    model_config = DEFERRED_BUILD
+
+    transferId: str
+    chunkIndex: int
+    totalChunks: int
+    contracts: List[QualifiedContractDto]
+
+
+class BarDto(BaseModel):
+    model_config = DEFERRED_BUILD
+
+    conId: int
+    open: float
+    high: float
+    low: float
+    close: float
+    count: int  # Number of ticker updates in the bar
+
+
+# Bars for every conId that traded during one time bucket. start is the bucket start (epoch seconds).
+class BarList(MessageDto):
+    model_config = DEFERRED_BUILD
+
+    start: float
+    interval: int  # Bar length in seconds
+    bars: List[BarDto]
+
+    @classmethod
+    def create(
+        cls, channel: Channel.Data, start: float, interval: int, bars: List[BarDto]
+    ):
+        return cls(
+            start=start,
+            interval=interval,
+            bars=bars,
+            channel=channel,
+        )
+
+
+# Response to IbClientDataRequestType.CONTRACTS_VERSION.
+class QualifiedContractsVersionDto(MessageDto):
+    model_config = DEFERRED_BUILD
+
+    version: str
+
+    @classmethod
+    def create(cls, version: str):
+        return cls(
+            version=version,
+            channel=Channel.Data.ContractsVersion,
+        )
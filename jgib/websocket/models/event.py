@@ -1,5 +1,5 @@
 from enum import Enum
-from .base import Channel, MessageDto
+from .base import Channel, MessageDto, DEFERRED_BUILD
 
 """
 ibClient events are sent from ibClient to notify other interested clients of important events, such as ib gateway connection status.
@@ -14,6 +14,8 @@ class IbClientEventType(str, Enum):
 
 
 class IbClientEventDto(MessageDto):
+    model_config = DEFERRED_BUILD
+
     event: IbClientEventType
 
     @classmethod
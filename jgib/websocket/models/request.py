@@ -1,5 +1,5 @@
 from enum import Enum
-from .base import Channel, MessageDto
+from .base import Channel, MessageDto, DEFERRED_BUILD
 
 """
 Connected clients can request data from the ibClient. Requests are used to ask for specific data from the ibClient.
@@ -8,9 +8,12 @@ Connected clients can request data from the ibClient. Requests are used to ask f
 
 class IbClientDataRequestType(str, Enum):
     CONTRACTS = "Contracts"  # Request a list of all qualified contracts. Each client does this at startup.
+    CONTRACTS_VERSION = "ContractsVersion"  # Request only the version hash of the contract list, to validate a cached copy.
 
 
 class IbClientDataRequestDto(MessageDto):
+    model_config = DEFERRED_BUILD
+
     request: IbClientDataRequestType
 
     @classmethod
@@ -1,2 +1,52 @@
-from .websocketClient import WebSocketClient
-from .websocketServer import WebSocketServer
+from typing import TYPE_CHECKING
+from ..._lazy import lazyAttributes
+
+if TYPE_CHECKING:
+    from .websocketClient import WebSocketClient
+    from .websocketServer import WebSocketServer
+    from .sharedTickerBuffer import SharedTickerBuffer
+    from .flowControl import FlowControlConfig, ChannelBudget
+    from .messageProcessor import MessageProcessor
+    from .barAggregator import BarAggregator
+    from .chunkAssembler import ChunkAssembler
+    from .contractCatalog import ContractCatalog
+    from .connectionHealth import ConnectionHealthMonitor
+    from .handlerExecution import ExecutionMode, MessageHandler, HandlerExecutor
+    from .handlerProfiling import ProfilingConfig
+    from .tickerDelta import (
+        TickerDeltaEncoder,
+        TickerDeltaDecoder,
+        TickerDeltaProcessor,
+    )
+    from .relay import RelayConfig
+    from .ingressValidation import (
+        IngressValidationConfig,
+        ValidationMode,
+        ValidationPolicy,
+    )
+
+_attributes = {
+    "WebSocketClient": ".websocketClient",
+    "WebSocketServer": ".websocketServer",
+    "SharedTickerBuffer": ".sharedTickerBuffer",
+    "FlowControlConfig": ".flowControl",
+    "ChannelBudget": ".flowControl",
+    "MessageProcessor": ".messageProcessor",
+    "BarAggregator": ".barAggregator",
+    "ChunkAssembler": ".chunkAssembler",
+    "ContractCatalog": ".contractCatalog",
+    "ConnectionHealthMonitor": ".connectionHealth",
+    "ExecutionMode": ".handlerExecution",
+    "MessageHandler": ".handlerExecution",
+    "HandlerExecutor": ".handlerExecution",
+    "ProfilingConfig": ".handlerProfiling",
+    "TickerDeltaEncoder": ".tickerDelta",
+    "TickerDeltaDecoder": ".tickerDelta",
+    "TickerDeltaProcessor": ".tickerDelta",
+    "RelayConfig": ".relay",
+    "IngressValidationConfig": ".ingressValidation",
+    "ValidationMode": ".ingressValidation",
+    "ValidationPolicy": ".ingressValidation",
+}
+__all__ = list(_attributes)
+__getattr__, __dir__ = lazyAttributes(__name__, globals(), _attributes)
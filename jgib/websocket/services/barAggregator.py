@@ -0,0 +1,125 @@
+import math
+from array import array
+from typing import Dict, List, Optional
+from ..models import BarDto, BarList, Channel, MessageDto
+from .messageProcessor import MessageProcessor
+
+"""
+Aggregates ticker updates into OHLC bars on the server, so subscribers that only need bars can subscribe to a derived
+channel such as dat@bars/1m instead of the raw ticker firehose. Each interval keeps the current bucket's bars in flat
+arrays indexed by conId; when the bucket rolls over, the completed bars are published as one BarList.
+"""
+
+BAR_INTERVAL_SECONDS: Dict[Channel.Data, int] = {
+    Channel.Data.Bars1s: 1,
+    Channel.Data.Bars1m: 60,
+    Channel.Data.Bars5m: 300,
+}
+
+
+def _isNumber(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _isInt64(value) -> bool:
+    return (
+        isinstance(value, int)
+        and not isinstance(value, bool)
+        and -(2**63) <= value < 2**63
+    )
+
+
+class _BarBucket:
+    def __init__(self, channel: Channel.Data):
+        self.channel = channel
+        self.interval = BAR_INTERVAL_SECONDS[channel]
+        self.bucket: Optional[int] = None
+        self.reset()
+
+    def reset(self):
+        self.index: Dict[int, int] = {}
+        self.conIds = array("q")
+        self.open = array("d")
+        self.high = array("d")
+        self.low = array("d")
+        self.close = array("d")
+        self.count = array("q")
+
+    def update(self, conId: int, price: float):
+        i = self.index.get(conId)
+        if i is None:
+            self.index[conId] = len(self.conIds)
+            self.conIds.append(conId)
+            self.open.append(price)
+            self.high.append(price)
+            self.low.append(price)
+            self.close.append(price)
+            self.count.append(1)
+            return
+        if price > self.high[i]:
+            self.high[i] = price
+        if price < self.low[i]:
+            self.low[i] = price
+        self.close[i] = price
+        self.count[i] += 1
+
+    def flush(self) -> Optional[BarList]:
+        """Return the completed bars (if any) and start an empty bucket."""
+        if self.bucket is None or not self.conIds:
+            return None
+        bars = [
+            BarDto(
+                conId=self.conIds[i],
+                open=self.open[i],
+                high=self.high[i],
+                low=self.low[i],
+                close=self.close[i],
+                count=self.count[i],
+            )
+            for i in range(len(self.conIds))
+        ]
+        start = self.bucket * self.interval
+        self.reset()
+        return BarList.create(self.channel, start, self.interval, bars)
+
+
+class BarAggregator(MessageProcessor):
+    def __init__(self, channels: Optional[List[Channel.Data]] = None):
+        """Build bars for the given bar channels (default: all of BAR_INTERVAL_SECONDS) from TickerDto.last."""
+        self._buckets = [
+            _BarBucket(channel) for channel in (channels or BAR_INTERVAL_SECONDS)
+        ]
+        self.skippedRecords = 0
+
+    def _rollOver(self, now: float) -> List[MessageDto]:
+        completed = []
+        for bucket in self._buckets:
+            current = int(now // bucket.interval)
+            if bucket.bucket != current:
+                bars = bucket.flush()
+                if bars:
+                    completed.append(bars)
+                bucket.bucket = current
+        return completed
+
+    def process(self, channel: str, data: Dict, now: float) -> List[MessageDto]:
+        if channel != Channel.Data.Tickers:
+            return []
+        completed = self._rollOver(now)
+        for ticker in data.get("tickers", []):
+            if not isinstance(ticker, dict):
+                self.skippedRecords += 1
+                continue
+            conId, last = ticker.get("conId"), ticker.get("last")
+            if last is None or (isinstance(last, float) and math.isnan(last)):
+                continue
+            # Malformed records are skipped so they can't break the other tickers in the frame
+            if not _isInt64(conId) or not _isNumber(last):
+                self.skippedRecords += 1
+                continue
+            for bucket in self._buckets:
+                bucket.update(conId, last)
+        return completed
+
+    def tick(self, now: float) -> List[MessageDto]:
+        return self._rollOver(now)
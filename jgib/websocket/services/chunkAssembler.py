@@ -0,0 +1,98 @@
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+"""
+Reassembles chunked transfers (e.g. QualifiedContractChunk pages) on the client. Pages are kept as the already-parsed
+item lists, so nothing is re-parsed on completion. Transfers that stop receiving pages are dropped after maxAgeSeconds,
+and a transfer with an invalid page (bad chunkIndex, or a totalChunks that differs from its earlier pages) is dropped
+at once.
+"""
+
+
+class _Transfer:
+    def __init__(self, totalChunks: int, now: float):
+        self.pages: List[Optional[List]] = [None] * totalChunks
+        self.received = 0
+        self.lastUpdate = now
+
+
+def _isInt(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class ChunkAssembler:
+    def __init__(
+        self,
+        itemsField: str = "contracts",
+        maxAgeSeconds: float = 60.0,
+        maxChunks: int = 100000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Assemble chunks whose items are in itemsField. Transfers announcing more than maxChunks pages are refused."""
+        self._itemsField = itemsField
+        self._maxAgeSeconds = maxAgeSeconds
+        self._maxChunks = maxChunks
+        self._clock = clock
+        self._transfers: Dict[str, _Transfer] = {}
+        self.droppedTransfers = 0
+
+    def add(self, chunk: Dict) -> Optional[Dict]:
+        """
+        Add a page. Returns the complete message ({"channel", itemsField}) once every page has arrived. Raises
+        ValueError for an invalid page, after dropping its transfer.
+        """
+        now = self._clock()
+        self._expire(now)
+        transferId = chunk.get("transferId")
+        try:
+            index, total, items = self._validate(chunk)
+        except ValueError:
+            if self._transfers.pop(transferId, None) is not None:
+                self.droppedTransfers += 1
+            raise
+        transfer = self._transfers.get(transferId)
+        if transfer is None:
+            transfer = self._transfers[transferId] = _Transfer(total, now)
+        elif len(transfer.pages) != total:
+            del self._transfers[transferId]
+            self.droppedTransfers += 1
+            raise ValueError(
+                f"Transfer {transferId}: totalChunks changed from {len(transfer.pages)} to {total}"
+            )
+        if transfer.pages[index] is None:
+            transfer.pages[index] = items
+            transfer.received += 1
+        transfer.lastUpdate = now
+        if transfer.received < len(transfer.pages):
+            return None
+        del self._transfers[transferId]
+        items = []
+        for page in transfer.pages:
+            items.extend(page)
+        return {"channel": chunk["channel"], self._itemsField: items}
+
+    def _validate(self, chunk: Dict) -> Tuple[int, int, List]:
+        transferId = chunk.get("transferId")
+        index, total = chunk.get("chunkIndex"), chunk.get("totalChunks")
+        items = chunk.get(self._itemsField)
+        if not _isInt(total) or not 0 < total <= self._maxChunks:
+            raise ValueError(f"Transfer {transferId}: invalid totalChunks {total!r}")
+        if not _isInt(index) or not 0 <= index < total:
+            raise ValueError(
+                f"Transfer {transferId}: chunkIndex {index!r} out of range for {total} chunks"
+            )
+        if not isinstance(items, list):
+            raise ValueError(f"Transfer {transferId}: {self._itemsField} is not a list")
+        return index, total, items
+
+    def _expire(self, now: float):
+        for transferId in [
+            transferId
+            for transferId, transfer in self._transfers.items()
+            if now - transfer.lastUpdate > self._maxAgeSeconds
+        ]:
+            del self._transfers[transferId]
+
+    @property
+    def pendingTransfers(self) -> int:
+        return len(self._transfers)
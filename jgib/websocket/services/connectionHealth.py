@@ -0,0 +1,123 @@
+import asyncio
+import websockets
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+"""
+Connection health monitoring for the WebSocket server and client. Each tracked connection is pinged every pingInterval
+seconds. Round-trip times are recorded per connection, and a connection that does not answer within pingTimeout is
+evicted, so half-open connections stop receiving (and costing) broadcasts within seconds instead of lingering until a
+send fails.
+
+A connection whose reads are paused on purpose (e.g. by flow control) can't see its pongs, so it is suspended for that
+time: it is not pinged, and a ping outstanding when it was suspended doesn't evict it.
+"""
+
+# Weight of the newest sample in the moving average RTT
+RTT_SMOOTHING = 0.2
+
+
+class ConnectionStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.lastRtt: Optional[float] = None
+        self.averageRtt: Optional[float] = None
+        self.maxRtt: Optional[float] = None
+        self.pingsSent = 0
+        self.pongsReceived = 0
+        self.suspended = False
+        # Incremented by every suspend, so a ping can tell whether the connection was suspended while it waited
+        self.suspensions = 0
+
+    def recordRtt(self, rtt: float):
+        self.pongsReceived += 1
+        self.lastRtt = rtt
+        self.maxRtt = rtt if self.maxRtt is None else max(self.maxRtt, rtt)
+        self.averageRtt = (
+            rtt
+            if self.averageRtt is None
+            else RTT_SMOOTHING * rtt + (1 - RTT_SMOOTHING) * self.averageRtt
+        )
+
+    def toDict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "lastRtt": self.lastRtt,
+            "averageRtt": self.averageRtt,
+            "maxRtt": self.maxRtt,
+            "pingsSent": self.pingsSent,
+            "pongsReceived": self.pongsReceived,
+            "suspended": self.suspended,
+        }
+
+
+class ConnectionHealthMonitor:
+    def __init__(
+        self,
+        pingInterval: float,
+        pingTimeout: float,
+        onEvict: Callable[[Hashable], Awaitable[None]],
+    ):
+        """Ping tracked connections periodically; call onEvict for connections that stop answering."""
+        self.pingInterval = pingInterval
+        self.pingTimeout = pingTimeout
+        self._onEvict = onEvict
+        self._connections: Dict[Hashable, ConnectionStats] = {}
+        self.evictions = 0
+        self.lastEvicted: Optional[str] = None
+
+    def track(self, connection: Hashable, name: str):
+        self._connections[connection] = ConnectionStats(name)
+
+    def untrack(self, connection: Hashable):
+        self._connections.pop(connection, None)
+
+    def suspend(self, connection: Hashable):
+        """Stop evicting the connection, e.g. while its reads are paused, until resume is called."""
+        stats = self._connections.get(connection)
+        if stats is not None and not stats.suspended:
+            stats.suspended = True
+            stats.suspensions += 1
+
+    def resume(self, connection: Hashable):
+        stats = self._connections.get(connection)
+        if stats is not None:
+            stats.suspended = False
+
+    def stats(self, connection: Hashable) -> Optional[ConnectionStats]:
+        return self._connections.get(connection)
+
+    async def run(self):
+        """Background task: ping every tracked connection concurrently, once per interval."""
+        while True:
+            await asyncio.sleep(self.pingInterval)
+            await asyncio.gather(*(self._ping(c) for c in list(self._connections)))
+
+    async def _ping(self, connection):
+        stats = self._connections.get(connection)
+        if stats is None or stats.suspended:
+            return
+        suspensions = stats.suspensions
+        try:
+            pongWaiter = await connection.ping()
+            stats.pingsSent += 1
+            # websockets resolves the pong waiter with the measured latency
+            stats.recordRtt(await asyncio.wait_for(pongWaiter, self.pingTimeout))
+        except asyncio.TimeoutError:
+            if stats.suspended or stats.suspensions != suspensions:
+                return
+            self.evictions += 1
+            self.lastEvicted = stats.name
+            self.untrack(connection)
+            await self._onEvict(connection)
+        except websockets.exceptions.ConnectionClosed:
+            self.untrack(connection)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """RTT stats per connection and eviction counts, for the application to inspect or export."""
+        return {
+            "pingInterval": self.pingInterval,
+            "pingTimeout": self.pingTimeout,
+            "evictions": self.evictions,
+            "lastEvicted": self.lastEvicted,
+            "connections": [stats.toDict() for stats in self._connections.values()],
+        }
@@ -0,0 +1,177 @@
+import json
+import mmap
+import os
+import struct
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional
+from ..models import QualifiedContractDto, QualifiedContractList
+
+"""
+A client-side catalog of qualified contracts with O(1) lookups by conId, symbol, secType and watchlist.
+
+The catalog can be saved to a local file and loaded on the next start. Loading memory-maps the file and parses only the
+header (version and indexes); each contract record is decoded the first time it is looked up. Together with the
+server's version hash (IbClientDataRequestType.CONTRACTS_VERSION), a service whose cached catalog is current can skip
+requesting and parsing the full contract list.
+
+File layout:
+    magic (8s) | header length (I) | header JSON | records
+The header holds the version, the record field names, each conId's (offset, length) and the secondary indexes.
+Each record is a JSON array of field values.
+"""
+
+_MAGIC = b"JGCCAT01"
+_PREFIX = struct.Struct("<8sI")
+_FIELDS = list(QualifiedContractDto.model_fields)
+_INDEXED_FIELDS = ("symbol", "secType", "watchlist")
+
+
+class ContractCatalog:
+    def __init__(
+        self,
+        version: str,
+        contracts: Dict[int, QualifiedContractDto],
+        indexes: Dict[str, Dict[str, List[int]]],
+        offsets: Optional[Dict[int, List[int]]] = None,
+        source: Optional[mmap.mmap] = None,
+        recordsStart: int = 0,
+    ):
+        """Use fromContracts, fromMessage or load instead of calling this directly."""
+        self.version = version
+        self._contracts = contracts
+        self._indexes = indexes
+        self._offsets = offsets or {}  # Records in source not decoded yet
+        self._source = source
+        self._recordsStart = recordsStart
+
+    @classmethod
+    def fromContracts(
+        cls, contracts: List[QualifiedContractDto], version: Optional[str] = None
+    ) -> "ContractCatalog":
+        """Build a catalog from contracts. The version defaults to QualifiedContractList.computeVersion."""
+        indexes = {field: defaultdict(list) for field in _INDEXED_FIELDS}
+        for contract in contracts:
+            for field in _INDEXED_FIELDS:
+                value = getattr(contract, field)
+                if value is not None:
+                    indexes[field][value].append(contract.conId)
+        return cls(
+            version or QualifiedContractList.computeVersion(contracts),
+            {contract.conId: contract for contract in contracts},
+            {field: dict(index) for field, index in indexes.items()},
+        )
+
+    @classmethod
+    def fromMessage(cls, data: Dict) -> "ContractCatalog":
+        """Build a catalog from a received QualifiedContractList message."""
+        return cls.fromContracts(QualifiedContractList(**data).contracts)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["ContractCatalog"]:
+        """Memory-map a saved catalog. Returns None if the file is missing, not a catalog, or corrupt."""
+        try:
+            with open(path, "rb") as file:
+                source = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):  # ValueError: empty file
+            return None
+        try:
+            magic, headerLength = _PREFIX.unpack_from(source, 0)
+            if magic != _MAGIC:
+                raise ValueError("Not a contract catalog")
+            if _PREFIX.size + headerLength > len(source):
+                raise ValueError("Truncated header")
+            header = json.loads(source[_PREFIX.size : _PREFIX.size + headerLength])
+            if header["fields"] != _FIELDS:
+                raise ValueError(
+                    "Written by a different version of QualifiedContractDto"
+                )
+            offsets = {
+                int(conId): offset for conId, offset in header["offsets"].items()
+            }
+            recordsStart = _PREFIX.size + headerLength
+            if any(
+                start + length > len(source) - recordsStart
+                for start, length in offsets.values()
+            ):
+                raise ValueError("Truncated records")
+            return cls(
+                header["version"], {}, header["indexes"], offsets, source, recordsStart
+            )
+        except (struct.error, ValueError, KeyError, TypeError, AttributeError):
+            # Corrupt or truncated cache (json.JSONDecodeError is a ValueError): fetch the contracts instead
+            source.close()
+            return None
+
+    def save(self, path: str):
+        """Write the catalog to path, replacing any existing file atomically."""
+        records = []
+        offsets = {}
+        position = 0
+        for contract in self:
+            record = json.dumps(
+                [getattr(contract, field) for field in _FIELDS], separators=(",", ":")
+            ).encode()
+            offsets[contract.conId] = [position, len(record)]
+            records.append(record)
+            position += len(record)
+        header = json.dumps(
+            {
+                "version": self.version,
+                "fields": _FIELDS,
+                "offsets": offsets,
+                "indexes": self._indexes,
+            },
+            separators=(",", ":"),
+        ).encode()
+        temporaryPath = f"{path}.tmp"
+        with open(temporaryPath, "wb") as file:
+            file.write(_PREFIX.pack(_MAGIC, len(header)))
+            file.write(header)
+            file.writelines(records)
+        os.replace(temporaryPath, path)
+
+    def isCurrent(self, version: str) -> bool:
+        """True if the catalog matches the server's contract list version."""
+        return self.version == version
+
+    def get(self, conId: int) -> Optional[QualifiedContractDto]:
+        contract = self._contracts.get(conId)
+        if contract is None and conId in self._offsets:
+            contract = self._contracts[conId] = self._decode(self._offsets.pop(conId))
+        return contract
+
+    def bySymbol(self, symbol: str) -> List[QualifiedContractDto]:
+        return self._lookup("symbol", symbol)
+
+    def bySecType(self, secType: str) -> List[QualifiedContractDto]:
+        return self._lookup("secType", secType)
+
+    def byWatchlist(self, watchlist: str) -> List[QualifiedContractDto]:
+        return self._lookup("watchlist", watchlist)
+
+    def _lookup(self, field: str, value: str) -> List[QualifiedContractDto]:
+        return [self.get(conId) for conId in self._indexes[field].get(value, [])]
+
+    def _decode(self, offset: List[int]) -> QualifiedContractDto:
+        start = self._recordsStart + offset[0]
+        values = json.loads(self._source[start : start + offset[1]])
+        # Records were validated before they were saved
+        return QualifiedContractDto.model_construct(**dict(zip(_FIELDS, values)))
+
+    def __len__(self) -> int:
+        return len(self._contracts) + len(self._offsets)
+
+    def __contains__(self, conId: int) -> bool:
+        return conId in self._contracts or conId in self._offsets
+
+    def __iter__(self) -> Iterator[QualifiedContractDto]:
+        conIds = list(self._contracts) + list(self._offsets)
+        return (self.get(conId) for conId in conIds)
+
+    def close(self):
+        """Decode any remaining records and release the memory-mapped file."""
+        if self._source:
+            for conId in list(self._offsets):
+                self.get(conId)
+            self._source.close()
+            self._source = None
@@ -0,0 +1,152 @@
+import math
+import time
+from collections import deque
+from pydantic import BaseModel
+from typing import Any, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+"""
+Flow control for messages received by the WebSocket server. Instead of disconnecting a client the moment it exceeds its
+rate limit, the server applies escalating measures:
+
+1. Backpressure: the server delays processing the client's messages until they fit its budget, and stops reading from
+   the socket once the client's inbox is full, which slows the publisher down through TCP flow control.
+2. Shedding: if the inbox stays full, the oldest data-channel frames from that client are dropped. Commands, requests and
+   subscriptions are never shed. A frame larger than the client's whole byte budget can never be delivered: a data
+   frame is shed, and any other frame is rejected with an error sent back to the client.
+3. Disconnect: only if the client has been continuously over budget for disconnectAfterSeconds.
+
+Budgets count both messages and bytes over a sliding one-minute window, per client and per client per channel.
+"""
+
+WINDOW_SECONDS = 60.0
+
+
+class ChannelBudget(BaseModel):
+    maxMessagesPerMinute: Optional[int] = None
+    maxBytesPerMinute: Optional[int] = None
+
+
+class FlowControlConfig(BaseModel):
+    # Defaults to the server's maxMessagesPerMinute
+    maxMessagesPerMinute: Optional[int] = None
+    maxBytesPerMinute: Optional[int] = None
+    # Applied to each client separately
+    channelBudgets: Dict[str, ChannelBudget] = {}
+    # Inbox size per client before reads are paused
+    maxQueuedFrames: int = 256
+    # How long reads stay paused before data frames are shed
+    shedAfterSeconds: float = 1.0
+    disconnectAfterSeconds: float = 120.0
+
+
+class SlidingWindow:
+    def __init__(
+        self,
+        maxMessages: Optional[int],
+        maxBytes: Optional[int],
+        windowSeconds: float = WINDOW_SECONDS,
+    ):
+        """Track messages and bytes over a sliding time window."""
+        self.maxMessages = maxMessages
+        self.maxBytes = maxBytes
+        self.windowSeconds = windowSeconds
+        self._entries: Deque[Tuple[float, int]] = deque()
+        self._bytes = 0
+
+    def _expire(self, now: float):
+        while self._entries and now - self._entries[0][0] >= self.windowSeconds:
+            self._bytes -= self._entries.popleft()[1]
+
+    def delay(self, now: float, size: int) -> float:
+        """Seconds until a message of the given size fits the budget. math.inf if it never will."""
+        self._expire(now)
+        if self.maxBytes is not None and size > self.maxBytes:
+            return math.inf
+        # How many of the oldest entries must expire before the message fits
+        expireCount = 0
+        if self.maxMessages is not None:
+            expireCount = max(0, len(self._entries) - self.maxMessages + 1)
+        if self.maxBytes is not None:
+            excess = self._bytes + size - self.maxBytes
+            freed, count = 0, 0
+            while freed < excess:
+                freed += self._entries[count][1]
+                count += 1
+            expireCount = max(expireCount, count)
+        if expireCount == 0:
+            return 0.0
+        return self._entries[expireCount - 1][0] + self.windowSeconds - now
+
+    def record(self, now: float, size: int):
+        self._entries.append((now, size))
+        self._bytes += size
+
+
+class FlowController:
+    def __init__(
+        self, config: FlowControlConfig, clock: Callable[[], float] = time.monotonic
+    ):
+        """Keep the per-client and per-client-per-channel budgets for the server."""
+        self.config = config
+        self.clock = clock
+        self._clientWindows: Dict[Hashable, SlidingWindow] = {}
+        self._channelWindows: Dict[Tuple[Hashable, str], SlidingWindow] = {}
+        self.throttleEvents = 0
+        self.shedFrames = 0
+        self.rejectedFrames = 0
+        self.disconnects = 0
+
+    def _windows(self, client: Hashable, channel: Optional[str]):
+        window = self._clientWindows.get(client)
+        if window is None:
+            window = self._clientWindows[client] = SlidingWindow(
+                self.config.maxMessagesPerMinute, self.config.maxBytesPerMinute
+            )
+        yield window
+        budget = self.config.channelBudgets.get(channel) if channel else None
+        if budget is not None:
+            key = (client, channel)
+            window = self._channelWindows.get(key)
+            if window is None:
+                window = self._channelWindows[key] = SlidingWindow(
+                    budget.maxMessagesPerMinute, budget.maxBytesPerMinute
+                )
+            yield window
+
+    def delay(self, client: Hashable, channel: Optional[str], size: int) -> float:
+        """Seconds until the client may send a message of this size on this channel."""
+        now = self.clock()
+        return max(w.delay(now, size) for w in self._windows(client, channel))
+
+    def record(self, client: Hashable, channel: Optional[str], size: int):
+        """Count an accepted message against the client's budgets."""
+        now = self.clock()
+        for window in self._windows(client, channel):
+            window.record(now, size)
+
+    def removeClient(self, client: Hashable):
+        self._clientWindows.pop(client, None)
+        for key in [key for key in self._channelWindows if key[0] == client]:
+            del self._channelWindows[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "throttleEvents": self.throttleEvents,
+            "shedFrames": self.shedFrames,
+            "rejectedFrames": self.rejectedFrames,
+            "disconnects": self.disconnects,
+        }
+
+
+def isDataChannel(channel: Optional[str]) -> bool:
+    """Data frames can be shed; commands, requests, events and subscriptions cannot."""
+    return bool(channel) and channel.startswith("dat@")
+
+
+def shedOldestDataFrame(inbox: Deque[Tuple[str, Dict]]) -> bool:
+    """Drop the oldest data-channel frame from an inbox of (message, data) pairs. Returns False if there is none."""
+    for i, (_, data) in enumerate(inbox):
+        if "action" not in data and isDataChannel(data.get("channel")):
+            del inbox[i]
+            return True
+    return False
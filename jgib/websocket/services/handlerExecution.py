@@ -0,0 +1,178 @@
+import asyncio
+import json
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+
+"""
+Execution policies for WebSocketClient message handlers. By default a handler runs inline on the event loop, which is
+right for cheap handlers. CPU-heavy handlers can instead run in a thread pool or a process pool so they don't stall the
+socket reader:
+
+    client.registerMessageHandlers({
+        Channel.Data.Tickers: MessageHandler(recomputeAnalytics, ExecutionMode.PROCESS, onResult=publishAnalytics),
+    })
+
+Process-pool handlers receive the message parsed in the worker from the raw frame, so the client does not parse it on
+the event loop and nothing but the raw text is pickled (except on channels carrying chunked transfers, whose pages the
+client reassembles first). They must be picklable (module-level functions).
+
+ordered=True (the default) runs a channel's messages one after another, in arrival order; ordered=False lets them run
+concurrently. At most maxInFlight offloaded messages are pending at once; beyond that the receive loop waits, which
+applies backpressure to the socket.
+"""
+
+
+class ExecutionMode(str, Enum):
+    INLINE = "Inline"
+    THREAD = "Thread"
+    PROCESS = "Process"
+
+
+class MessageHandler:
+    def __init__(
+        self,
+        handler: Callable[[Dict], Any],
+        mode: ExecutionMode = ExecutionMode.INLINE,
+        ordered: bool = True,
+        onResult: Optional[Callable[[Any], Any]] = None,
+    ):
+        """Wrap a handler with an execution policy. onResult is called on the event loop with the handler's return value."""
+        self.handler = handler
+        self.mode = mode
+        self.ordered = ordered
+        self.onResult = onResult
+        self.isCoroutine = asyncio.iscoroutinefunction(handler)
+        if self.isCoroutine and mode != ExecutionMode.INLINE:
+            raise ValueError("Coroutine handlers can only run inline")
+
+
+def _handleRaw(handler: Callable[[Dict], Any], raw: str) -> Any:
+    """Runs in a worker process: parse the frame there rather than on the event loop."""
+    return handler(json.loads(raw))
+
+
+# MessageDto subclasses serialize their channel first, so it can be read without parsing the whole frame
+_CHANNEL_PREFIX = re.compile(r'\{"channel":"([^"\\]*)"')
+
+
+def peekChannel(message: str) -> Optional[str]:
+    """Return the channel of a serialized MessageDto without parsing it, or None if it is not at the start."""
+    match = _CHANNEL_PREFIX.match(message)
+    return match.group(1) if match else None
+
+
+class HandlerExecutor:
+    def __init__(
+        self,
+        onError: Callable[[str, BaseException], None],
+        maxInFlight: int = 64,
+        threadPoolWorkers: Optional[int] = None,
+        processPoolWorkers: Optional[int] = None,
+        onHandled: Optional[Callable[[str, float], None]] = None,
+    ):
+        """
+        Run handlers according to their MessageHandler policy. Pools are created on first use.
+        If onHandled is given, it is called with the channel and duration of every successful handler call.
+        """
+        self._onError = onError
+        self._onHandled = onHandled
+        self._maxInFlight = maxInFlight
+        self._inFlight: Optional[asyncio.Semaphore] = None
+        self._threadPoolWorkers = threadPoolWorkers
+        self._processPoolWorkers = processPoolWorkers
+        self._threadPool: Optional[ThreadPoolExecutor] = None
+        self._processPool: Optional[ProcessPoolExecutor] = None
+        self._channelTails: Dict[str, asyncio.Task] = {}
+        self._tasks = set()
+
+    async def run(
+        self,
+        policy: MessageHandler,
+        channel: str,
+        data: Optional[Dict] = None,
+        raw: Optional[str] = None,
+    ):
+        """Run a handler for one message. Give data, raw, or both; raw is preferred for process-pool handlers."""
+        if policy.mode == ExecutionMode.INLINE:
+            start = time.perf_counter() if self._onHandled else 0.0
+            result = (
+                await policy.handler(data)
+                if policy.isCoroutine
+                else policy.handler(data)
+            )
+            if self._onHandled:
+                self._onHandled(channel, time.perf_counter() - start)
+            if policy.onResult:
+                policy.onResult(result)
+            return
+        if self._inFlight is None:
+            self._inFlight = asyncio.Semaphore(self._maxInFlight)
+        await self._inFlight.acquire()
+        previous = self._channelTails.get(channel) if policy.ordered else None
+        task = asyncio.create_task(self._offload(policy, channel, data, raw, previous))
+        self._tasks.add(task)
+        task.add_done_callback(self._taskDone)
+        if policy.ordered:
+            self._channelTails[channel] = task
+
+    def _taskDone(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        self._inFlight.release()
+
+    async def _offload(
+        self,
+        policy: MessageHandler,
+        channel: str,
+        data: Optional[Dict],
+        raw: Optional[str],
+        previous: Optional[asyncio.Task],
+    ):
+        if previous is not None:
+            # Keep per-channel order; the previous message's errors are reported by its own task
+            await asyncio.wait([previous])
+        loop = asyncio.get_running_loop()
+        # Offloaded durations include time spent waiting for a free pool worker
+        start = time.perf_counter() if self._onHandled else 0.0
+        try:
+            if policy.mode == ExecutionMode.THREAD:
+                if self._threadPool is None:
+                    self._threadPool = ThreadPoolExecutor(self._threadPoolWorkers)
+                if data is None:
+                    data = json.loads(raw)
+                result = await loop.run_in_executor(
+                    self._threadPool, policy.handler, data
+                )
+            else:
+                if self._processPool is None:
+                    self._processPool = ProcessPoolExecutor(self._processPoolWorkers)
+                if raw is None:
+                    raw = json.dumps(data)
+                result = await loop.run_in_executor(
+                    self._processPool, _handleRaw, policy.handler, raw
+                )
+            if self._onHandled:
+                self._onHandled(channel, time.perf_counter() - start)
+            if policy.onResult:
+                policy.onResult(result)
+        except Exception as e:
+            self._onError(channel, e)
+        finally:
+            if self._channelTails.get(channel) is asyncio.current_task():
+                del self._channelTails[channel]
+
+    async def drain(self):
+        """Wait for all offloaded handlers to finish."""
+        if self._tasks:
+            await asyncio.wait(list(self._tasks))
+
+    def shutdown(self):
+        """Cancel pending work and stop the pools."""
+        for task in list(self._tasks):
+            task.cancel()
+        for pool in (self._threadPool, self._processPool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._threadPool = self._processPool = None
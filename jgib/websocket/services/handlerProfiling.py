@@ -0,0 +1,121 @@
+import asyncio
+import bisect
+import math
+from collections import defaultdict
+from pydantic import BaseModel
+from typing import Any, Callable, Dict, List, Optional
+
+"""
+Opt-in instrumentation for WebSocketClient message handlers. When enabled, the client records a latency histogram and
+a call count per channel, warns about handler calls slower than slowHandlerSeconds, and runs a probe that measures how
+late the event loop wakes up from a sleep (event-loop lag). A consumer falling behind can then be traced to a specific
+handler, or to the loop being blocked.
+
+When profiling is disabled the client skips all of this; the per-message cost is a single check.
+"""
+
+# Upper bounds (seconds) of the histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS: List[float] = [
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    math.inf,
+]
+
+
+class ProfilingConfig(BaseModel):
+    slowHandlerSeconds: float = 0.05  # Warn about handler calls slower than this
+    loopLagIntervalSeconds: Optional[float] = 0.1  # None disables the lag probe
+    slowLoopLagSeconds: float = 0.1  # Warn when the loop wakes up this late
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction of samples (the max for the last bucket)."""
+        if not self.count:
+            return None
+        rank = math.ceil(fraction * self.count)
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def toDict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "buckets": {
+                str(bound): count
+                for bound, count in zip(LATENCY_BUCKETS, self.counts)
+                if count
+            },
+        }
+
+
+class HandlerProfiler:
+    def __init__(self, config: ProfilingConfig):
+        self.config = config
+        self._handlers: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self.slowCalls: Dict[str, int] = defaultdict(int)
+        self.loopLag = LatencyHistogram()
+        self.lastLoopLag: Optional[float] = None
+
+    def record(self, channel: str, seconds: float) -> bool:
+        """Record one handler call. Returns True if it was slow."""
+        self._handlers[channel].record(seconds)
+        if seconds > self.config.slowHandlerSeconds:
+            self.slowCalls[channel] += 1
+            return True
+        return False
+
+    async def runLoopLagProbe(self, onSlowLag: Callable[[float], None]):
+        """Background task: sleep for the probe interval and record how much later than requested the loop woke up."""
+        loop = asyncio.get_running_loop()
+        interval = self.config.loopLagIntervalSeconds
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - expected)
+            self.loopLag.record(lag)
+            self.lastLoopLag = lag
+            if lag > self.config.slowLoopLagSeconds:
+                onSlowLag(lag)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "handlers": {
+                channel: {**histogram.toDict(), "slowCalls": self.slowCalls[channel]}
+                for channel, histogram in self._handlers.items()
+            },
+            "loopLag": {**self.loopLag.toDict(), "last": self.lastLoopLag},
+        }
@@ -0,0 +1,124 @@
+from collections import defaultdict
+from enum import Enum
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from typing import Any, Dict, Hashable, Optional, Set, Tuple, Union
+from ..models import (
+    BarList,
+    Channel,
+    IbClientCommandDto,
+    IbClientDataRequestDto,
+    IbClientEventDto,
+    QualifiedContractChunk,
+    QualifiedContractList,
+    QualifiedContractsVersionDto,
+    TickerDeltaList,
+    TickerList,
+)
+
+"""
+Schema validation of messages published to the WebSocket server. By default the server only parses a message to find
+its channel and forwards it as is, so a malformed message reaches every subscriber. With a validation policy the server
+checks messages against the channel's MessageDto before broadcasting them, and rejects those that don't match.
+
+Validation is costly on high-volume channels, so each channel has its own policy:
+    OFF                  never validate
+    FULL                 validate every message
+    SAMPLED              validate every Nth message on the channel
+    FIRST_PER_PUBLISHER  validate each publisher's messages until one is valid, then trust it
+
+Validators are compiled once per channel (pydantic TypeAdapter) and parse the raw JSON directly.
+"""
+
+
+class ValidationMode(str, Enum):
+    OFF = "Off"
+    FULL = "Full"
+    SAMPLED = "Sampled"
+    FIRST_PER_PUBLISHER = "FirstPerPublisher"
+
+
+class ValidationPolicy(BaseModel):
+    mode: ValidationMode = ValidationMode.OFF
+    sampleEvery: int = 100  # For SAMPLED
+
+
+class IngressValidationConfig(BaseModel):
+    channelPolicies: Dict[str, ValidationPolicy] = {}
+    defaultPolicy: ValidationPolicy = ValidationPolicy()
+
+
+# The MessageDto published on each channel
+CHANNEL_MODELS: Dict[str, Any] = {
+    Channel.Data.Tickers.value: TickerList,
+    Channel.Data.TickerDeltas.value: TickerDeltaList,
+    Channel.Data.Contracts.value: Union[QualifiedContractChunk, QualifiedContractList],
+    Channel.Data.ContractsVersion.value: QualifiedContractsVersionDto,
+    Channel.Data.Bars1s.value: BarList,
+    Channel.Data.Bars1m.value: BarList,
+    Channel.Data.Bars5m.value: BarList,
+    Channel.Command.IbClient.value: IbClientCommandDto,
+    Channel.Request.IbClient.value: IbClientDataRequestDto,
+    Channel.Event.IbClient.value: IbClientEventDto,
+}
+
+
+class IngressValidator:
+    def __init__(
+        self,
+        config: IngressValidationConfig,
+        channelModels: Optional[Dict[str, Any]] = None,
+    ):
+        """Apply the configured validation policies. channelModels defaults to CHANNEL_MODELS."""
+        self.config = config
+        self.channelModels = CHANNEL_MODELS if channelModels is None else channelModels
+        self._adapters: Dict[str, TypeAdapter] = {}
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._trusted: Set[Tuple[Hashable, str]] = set()
+        self.validated: Dict[str, int] = defaultdict(int)
+        self.rejected: Dict[str, int] = defaultdict(int)
+        self.rejectedByPublisher: Dict[str, int] = defaultdict(int)
+        self.lastRejection: Optional[str] = None
+
+    def shouldValidate(self, publisher: Hashable, channel: str) -> bool:
+        if channel not in self.channelModels:
+            return False
+        policy = self.config.channelPolicies.get(channel, self.config.defaultPolicy)
+        if policy.mode == ValidationMode.OFF:
+            return False
+        if policy.mode == ValidationMode.SAMPLED:
+            count = self._counters[channel]
+            self._counters[channel] = count + 1
+            return count % policy.sampleEvery == 0  # The first message, then every Nth
+        if policy.mode == ValidationMode.FIRST_PER_PUBLISHER:
+            return (publisher, channel) not in self._trusted
+        return True
+
+    def validate(
+        self, publisher: Hashable, publisherName: str, channel: str, message: str
+    ):
+        """Validate the message if the channel's policy calls for it. Raises ValidationError if it is rejected."""
+        if not self.shouldValidate(publisher, channel):
+            return
+        adapter = self._adapters.get(channel)
+        if adapter is None:
+            adapter = self._adapters[channel] = TypeAdapter(self.channelModels[channel])
+        self.validated[channel] += 1
+        try:
+            adapter.validate_json(message)
+        except ValidationError:
+            self.rejected[channel] += 1
+            self.rejectedByPublisher[publisherName] += 1
+            self.lastRejection = f"{publisherName} on {channel}"
+            raise
+        self._trusted.add((publisher, channel))
+
+    def removePublisher(self, publisher: Hashable):
+        self._trusted = {key for key in self._trusted if key[0] != publisher}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "validated": dict(self.validated),
+            "rejected": dict(self.rejected),
+            "rejectedByPublisher": dict(self.rejectedByPublisher),
+            "lastRejection": self.lastRejection,
+        }
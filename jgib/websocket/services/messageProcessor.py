@@ -0,0 +1,18 @@
+from typing import Dict, List
+from ..models import MessageDto
+
+"""
+Message processors plug into the WebSocket server to derive new messages from the ones it relays. The server calls
+process() for every broadcast message and tick() periodically, and publishes whatever they return on the returned
+DTOs' channels.
+"""
+
+
+class MessageProcessor:
+    def process(self, channel: str, data: Dict, now: float) -> List[MessageDto]:
+        """Handle a message broadcast on a channel. Return any derived messages to publish."""
+        return []
+
+    def tick(self, now: float) -> List[MessageDto]:
+        """Called periodically, so time-based output is published even when no messages arrive."""
+        return []
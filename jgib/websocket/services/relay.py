@@ -0,0 +1,159 @@
+import asyncio
+import json
+import urllib.parse
+import websockets
+from jgmd.logging import FreeTextLogger
+from pydantic import BaseModel
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from ..models import SubscriptionAction, SubscriptionDto
+
+"""
+Server-to-server relaying. A WebSocketServer given a RelayConfig connects to an upstream WebSocketServer and fans its
+messages out to local clients, so subscribers can be spread across several nodes while the upstream sends each message
+once per relay:
+
+    ibClient -> root server -> relay A -> subscribers
+                            -> relay B -> subscribers
+
+The relay subscribes upstream to a channel when its first local client subscribes to it, and unsubscribes once the last
+one leaves. Messages published by local clients (e.g. commands for the ibClient) are broadcast locally and forwarded
+upstream. A relay authenticates with the upstream's relayToken; the upstream doesn't apply its rate limits or flow
+control to relays, since each relay carries many clients.
+While the upstream is unreachable, published messages are dropped and counted (droppedMessages).
+
+Loops are prevented with node ids. A relay sends its node id in the handshake, and the upstream answers with its path:
+its own id followed by those of its upstreams (RELAY_PATH_HEADER). An upstream refuses a relay whose id is on its
+path, a relay drops an upstream whose path contains its own id, and when a node's path changes it sends the new path to
+its relay clients ({"relayPath": [...]}) so they can check it too.
+"""
+
+RELAY_PATH_HEADER = "X-Jgib-Relay-Path"
+
+
+class RelayConfig(BaseModel):
+    uri: str  # e.g. "ws://root-host:8765"
+    token: str  # The upstream server's relayToken
+    unixPath: Optional[str] = None  # Connect through this Unix socket instead
+    reconnectSeconds: float = 1.0
+
+
+class UpstreamRelay:
+    def __init__(
+        self,
+        config: RelayConfig,
+        nodeId: str,
+        logger: FreeTextLogger,
+        onMessage: Callable[[str, Dict], Awaitable[None]],
+        onPath: Callable[[List[str]], Awaitable[bool]],
+    ):
+        """
+        Keep a connection to the upstream server. onMessage receives every message from upstream; onPath receives the
+        upstream path and returns False if it forms a loop.
+        """
+        self.config = config
+        self.nodeId = nodeId
+        self.logger = logger
+        self._onMessage = onMessage
+        self._onPath = onPath
+        self.channels: Set[str] = set()  # Channels subscribed upstream
+        self._websocket = None
+        self._outbox: Optional[asyncio.Queue] = None
+        self.connected = asyncio.Event()
+        self.droppedMessages = 0
+        self._outageDrops = 0
+
+    def subscribe(self, channel: str):
+        if channel not in self.channels:
+            self.channels.add(channel)
+            self._send(self._subscription(SubscriptionAction.SUBSCRIBE, channel))
+
+    def unsubscribe(self, channel: str):
+        if channel in self.channels:
+            self.channels.discard(channel)
+            self._send(self._subscription(SubscriptionAction.UNSUBSCRIBE, channel))
+
+    def publish(self, message: str):
+        """Forward a message published by a local client. Dropped while the upstream is unreachable."""
+        if not self.connected.is_set():
+            self.droppedMessages += 1
+            self._outageDrops += 1
+            if self._outageDrops == 1:
+                self.logger.logWarning(
+                    lambda: f"Relay {self.nodeId}: upstream {self.config.uri} is down, dropping published messages"
+                )
+            return
+        self._send(message)
+
+    @staticmethod
+    def _subscription(action: SubscriptionAction, channel: str) -> str:
+        return SubscriptionDto(action=action.value, channel=channel).model_dump_json()
+
+    def _send(self, message: str):
+        # Subscriptions made while disconnected are replayed on reconnect
+        if self._outbox is not None and self.connected.is_set():
+            self._outbox.put_nowait(message)
+
+    async def run(self):
+        """Background task: stay connected to the upstream, reconnecting after reconnectSeconds."""
+        while True:
+            try:
+                await self._connectAndRelay()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.logError(
+                    lambda: f"Relay {self.nodeId} lost upstream {self.config.uri}: {e}"
+                )
+            finally:
+                self.connected.clear()
+                self._websocket = None
+            await asyncio.sleep(self.config.reconnectSeconds)
+
+    async def _connectAndRelay(self):
+        query = urllib.parse.urlencode(
+            {
+                "token": self.config.token,
+                "name": f"relay:{self.nodeId}",
+                "relayNode": self.nodeId,
+            }
+        )
+        uri = f"{self.config.uri}?{query}"
+        if self.config.unixPath is not None:
+            connect = websockets.unix_connect(self.config.unixPath, uri)
+        else:
+            connect = websockets.connect(uri)
+        async with connect as websocket:
+            path = websocket.response.headers.get(RELAY_PATH_HEADER, "")
+            if not await self._onPath(path.split(",") if path else []):
+                return
+            self._websocket = websocket
+            self._outbox = asyncio.Queue()
+            for channel in self.channels:
+                self._outbox.put_nowait(
+                    self._subscription(SubscriptionAction.SUBSCRIBE, channel)
+                )
+            self.connected.set()
+            self.logger.logSuccessful(
+                lambda: f"Relay {self.nodeId} connected to upstream {self.config.uri}"
+            )
+            if self._outageDrops:
+                dropped, self._outageDrops = self._outageDrops, 0
+                self.logger.logWarning(
+                    lambda: f"Relay {self.nodeId} dropped {dropped} published messages while the upstream was down"
+                )
+            writer = asyncio.create_task(self._write(websocket, self._outbox))
+            try:
+                async for message in websocket:
+                    data = json.loads(message)
+                    if "relayPath" in data:
+                        if not await self._onPath(data["relayPath"]):
+                            return
+                        continue
+                    await self._onMessage(message, data)
+            finally:
+                writer.cancel()
+
+    @staticmethod
+    async def _write(websocket, outbox: asyncio.Queue):
+        while True:
+            await websocket.send(await outbox.get())
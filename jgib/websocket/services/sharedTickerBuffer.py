@@ -0,0 +1,194 @@
+import os
+import struct
+import sys
+import zlib
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterable, List, Optional
+
+"""
+A single-writer, multi-reader ring buffer in shared memory for ticker data. Consumers running on the same host as the
+WebSocket server can read ticker updates directly from shared memory instead of receiving a JSON copy over the socket.
+The websocket remains the control plane (auth, subscriptions, commands); only the ticker data path moves here.
+
+Layout (little-endian):
+    header: magic (8s) | capacity (Q) | writeSeq (Q)
+    slots:  seq (Q) | conId (q) | last (d) | startPrice (d) | pctDeviation (d) | flags (B) | source (I) | symbol (32s)
+
+Each slot is stamped with the sequence number it was written with. The writer marks a slot busy before filling it and
+stamps it afterwards, so a reader can detect a slot that was overwritten (or was being written) while it read it.
+
+source is a hash of the publishing client's name, so a client that publishes tickers can skip its own records, as it
+would on the socket.
+"""
+
+_MAGIC = b"JGIBTKR2"
+_HEADER = struct.Struct("<8sQQ")
+_SLOT = struct.Struct("<QqdddBI32s")
+_SEQ = struct.Struct("<Q")
+_BUSY = 0xFFFFFFFFFFFFFFFF
+_WRITE_SEQ_OFFSET = 16
+
+_HAS_START_PRICE = 0x1
+_HAS_PCT_DEVIATION = 0x2
+
+SYMBOL_MAX_BYTES = 32
+
+
+def _sourceId(source: Optional[str]) -> int:
+    return zlib.crc32(source.encode()) if source else 0
+
+
+# Segments created by this process, which stay registered with its resource tracker
+_createdNames = set()
+
+
+class SharedTickerBuffer:
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int, owner: bool):
+        """Use SharedTickerBuffer.create (writer) or SharedTickerBuffer.attach (reader) instead of calling this directly."""
+        self._shm = shm
+        self._buf = shm.buf
+        self._capacity = capacity
+        self._owner = owner
+        self._readSeq = self._writeSeq() if not owner else 0
+        # Records write() could not store (e.g. missing conId or last)
+        self.skippedRecords = 0
+
+    @classmethod
+    def create(cls, name: str, capacity: int = 65536) -> "SharedTickerBuffer":
+        """Create the buffer. Only the server (the single writer) should call this."""
+        size = _HEADER.size + capacity * _SLOT.size
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # A previous server did not shut down cleanly. Reclaim the segment.
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _createdNames.add(name)
+        _HEADER.pack_into(shm.buf, 0, _MAGIC, capacity, 0)
+        for i in range(capacity):
+            _SEQ.pack_into(shm.buf, _HEADER.size + i * _SLOT.size, _BUSY)
+        return cls(shm, capacity, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedTickerBuffer":
+        """Attach to an existing buffer as a reader. Raises FileNotFoundError if the server has not created it."""
+        # A reader must not register the segment with its resource tracker, which would unlink it when the reader exits
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+            # The writer's own registration is the same entry when it attaches in its process; keep that one
+            if os.name == "posix" and name not in _createdNames:
+                resource_tracker.unregister(shm._name, "shared_memory")
+        magic, capacity, _ = _HEADER.unpack_from(shm.buf, 0)
+        if magic != _MAGIC:
+            shm.close()
+            raise ValueError(f"Shared memory segment {name} is not a ticker buffer")
+        return cls(shm, capacity, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def _writeSeq(self) -> int:
+        return _SEQ.unpack_from(self._buf, _WRITE_SEQ_OFFSET)[0]
+
+    def write(self, tickers: Iterable[Dict], source: Optional[str] = None) -> int:
+        """
+        Append ticker records (dicts shaped like TickerDto) and publish them to readers in one step. source names the
+        publishing client. Records that don't fit a slot (e.g. without conId or last) are skipped; returns their count.
+        """
+        buf = self._buf
+        seq = self._writeSeq()
+        sourceId = _sourceId(source)
+        skipped = 0
+        for ticker in tickers:
+            offset = _HEADER.size + (seq % self._capacity) * _SLOT.size
+            try:
+                startPrice = ticker.get("startPrice")
+                pctDeviation = ticker.get("pctDeviation")
+                flags = (_HAS_START_PRICE if startPrice is not None else 0) | (
+                    _HAS_PCT_DEVIATION if pctDeviation is not None else 0
+                )
+                symbol = str(ticker.get("symbol", "")).encode()[:SYMBOL_MAX_BYTES]
+                # pack_into checks every value before writing, so a bad record leaves the slot untouched
+                _SLOT.pack_into(
+                    buf,
+                    offset,
+                    _BUSY,
+                    ticker["conId"],
+                    ticker["last"],
+                    startPrice or 0.0,
+                    pctDeviation or 0.0,
+                    flags,
+                    sourceId,
+                    symbol,
+                )
+            except (AttributeError, KeyError, TypeError, struct.error):
+                skipped += 1
+                continue
+            _SEQ.pack_into(buf, offset, seq)
+            seq += 1
+        _SEQ.pack_into(buf, _WRITE_SEQ_OFFSET, seq)
+        self.skippedRecords += skipped
+        return skipped
+
+    def read(self, excludeSource: Optional[str] = None) -> List[Dict]:
+        """
+        Return the tickers written since the previous read, keeping only the latest record per conId.
+        Records that were overwritten before this reader got to them, or were published by excludeSource, are skipped.
+        """
+        buf = self._buf
+        excludeId = _sourceId(excludeSource) if excludeSource else None
+        writeSeq = self._writeSeq()
+        seq = max(self._readSeq, writeSeq - self._capacity)
+        latest: Dict[int, Dict] = {}
+        while seq < writeSeq:
+            offset = _HEADER.size + (seq % self._capacity) * _SLOT.size
+            record = _SLOT.unpack_from(buf, offset)
+            if (
+                record[0] == seq
+                and record[6] != excludeId
+                and _SEQ.unpack_from(buf, offset)[0] == seq
+            ):
+                _, conId, last, startPrice, pctDeviation, flags, _, symbol = record
+                latest[conId] = {
+                    "conId": conId,
+                    "symbol": symbol.rstrip(b"\x00").decode(errors="replace"),
+                    "last": last,
+                    "startPrice": startPrice if flags & _HAS_START_PRICE else None,
+                    "pctDeviation": (
+                        pctDeviation if flags & _HAS_PCT_DEVIATION else None
+                    ),
+                }
+            seq += 1
+        self._readSeq = writeSeq
+        return list(latest.values())
+
+    def skipToLatest(self):
+        """Skip everything written so far; the next read returns only newer records."""
+        self._readSeq = self._writeSeq()
+
+    def close(self):
+        """Detach from the buffer. The writer also removes the segment."""
+        self._buf = None
+        self._shm.close()
+        if self._owner:
+            _createdNames.discard(self.name)
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                # Already removed, e.g. by another process's resource tracker
+                if os.name == "posix":
+                    resource_tracker.unregister(self._shm._name, "shared_memory")
+
+
+def isLocalHost(host: Optional[str]) -> bool:
+    """True if a host name refers to this machine."""
+    return host in ("localhost", "127.0.0.1", "::1", "[::1]")
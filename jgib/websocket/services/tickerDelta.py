@@ -0,0 +1,117 @@
+from pydantic import BaseModel, ValidationError
+from typing import Dict, List, Optional, Union
+from ..models import Channel, MessageDto, TickerDeltaDto, TickerDeltaList, TickerDto
+from .messageProcessor import MessageProcessor
+
+"""
+Delta encoding of ticker frames. Most fields of a TickerList are unchanged from one frame to the next (symbol and
+startPrice always, last for illiquid contracts), so a delta stream sends only the conIds and fields that changed, plus a
+full keyframe every keyframeInterval frames.
+
+Deltas are published on Channel.Data.TickerDeltas, either by the server (add a TickerDeltaProcessor; publishers keep
+sending full TickerLists) or by a publisher using TickerDeltaEncoder directly. Use one or the other for a stream: each
+encoder numbers its own frames. A WebSocketClient subscribed to the delta channel rebuilds the full ticker per conId and
+calls its dat@tickers handler with the tickers in each frame: every conId on a keyframe, but only the conIds that
+changed on a delta frame, so handlers should keep their own state per conId rather than expect the whole watchlist.
+
+A receiver that misses a frame (or joins mid-stream) drops deltas until the next keyframe rather than present stale
+values.
+"""
+
+_MISSING = object()
+
+
+class TickerDeltaEncoder:
+    def __init__(self, keyframeInterval: int = 100):
+        """Emit a keyframe with the full state every keyframeInterval frames, starting with the first."""
+        self.keyframeInterval = keyframeInterval
+        self._state: Dict[int, Dict] = {}
+        self._sequence = 0
+        self.skippedRecords = 0
+
+    def encode(self, tickers: List[Union[TickerDto, Dict]]) -> TickerDeltaList:
+        """Encode the next frame. Malformed records are skipped (counted in skippedRecords) and leave the state as is."""
+        keyframe = self._sequence % self.keyframeInterval == 0
+        deltas = []
+        for ticker in tickers:
+            if isinstance(ticker, BaseModel):
+                ticker = ticker.model_dump()
+            try:
+                conId = ticker["conId"]
+                if not isinstance(conId, int) or isinstance(conId, bool):
+                    raise TypeError(f"conId {conId!r} is not an int")
+                previous = self._state.get(conId)
+                if previous is None:
+                    changed = ticker
+                else:
+                    changed = {
+                        field: value
+                        for field, value in ticker.items()
+                        if previous.get(field, _MISSING) != value
+                    }
+                    if not changed:
+                        continue
+                    changed["conId"] = conId
+                # Validate before updating the state, so a bad record can't break later deltas or keyframes
+                delta = TickerDeltaDto(**changed)
+            except (AttributeError, KeyError, TypeError, ValidationError):
+                self.skippedRecords += 1
+                continue
+            if previous is None:
+                self._state[conId] = dict(ticker)
+            else:
+                previous.update(changed)
+            if not keyframe:
+                deltas.append(delta)
+        if keyframe:
+            deltas = [TickerDeltaDto(**state) for state in self._state.values()]
+        frame = TickerDeltaList.create(self._sequence, keyframe, deltas)
+        self._sequence += 1
+        return frame
+
+
+class TickerDeltaDecoder:
+    def __init__(self):
+        """Rebuild full tickers from a TickerDeltaList stream."""
+        self._state: Dict[int, Dict] = {}
+        self._sequence: Optional[int] = None
+        self.gaps = 0
+
+    def apply(self, data: Dict) -> Optional[List[Dict]]:
+        """
+        Apply a received TickerDeltaList message. Returns the full ticker of every conId in the frame, or None while
+        waiting for a keyframe.
+        """
+        sequence = data["sequence"]
+        if data["keyframe"]:
+            self._state = {}
+        elif self._sequence is None or sequence != self._sequence + 1:
+            if self._sequence is not None:
+                self.gaps += 1
+            self._sequence = None
+            return None
+        self._sequence = sequence
+        tickers = []
+        for delta in data["tickers"]:
+            state = self._state.get(delta["conId"])
+            if state is None:
+                state = self._state[delta["conId"]] = delta
+            else:
+                state.update(delta)
+            tickers.append(dict(state))  # Handlers get copies; the state stays intact
+        return tickers
+
+
+class TickerDeltaProcessor(MessageProcessor):
+    def __init__(self, keyframeInterval: int = 100):
+        """Server-side: publish every dat@tickers frame on dat@tickers/delta as well, delta-encoded."""
+        self._encoder = TickerDeltaEncoder(keyframeInterval)
+
+    def process(self, channel: str, data: Dict, now: float) -> List[MessageDto]:
+        if channel != Channel.Data.Tickers:
+            return []
+        return [self._encoder.encode(data.get("tickers", []))]
+
+    @property
+    def skippedRecords(self) -> int:
+        return self._encoder.skippedRecords
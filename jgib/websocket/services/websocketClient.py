@@ -1,10 +1,22 @@
 import asyncio
 import websockets
 import json
-from typing import Callable, Dict, Awaitable, List
+import urllib.parse
+from typing import Any, Callable, Dict, Awaitable, List, Optional, Set, Union
 from jgmd.logging import FreeTextLogger, LogLevel
 from jgmd.util import exceptionToStr
 from ..models import SubscriptionDto, Channel, SubscriptionAction, MessageDto
+from .sharedTickerBuffer import SharedTickerBuffer, isLocalHost
+from .chunkAssembler import ChunkAssembler
+from .connectionHealth import ConnectionHealthMonitor
+from .handlerExecution import (
+    ExecutionMode,
+    HandlerExecutor,
+    MessageHandler,
+    peekChannel,
+)
+from .handlerProfiling import HandlerProfiler, ProfilingConfig
+from .tickerDelta import TickerDeltaDecoder
 from websockets.asyncio.client import ClientConnection
 
 """
@@ -14,21 +26,91 @@ receiving messages in the background. It also allows for registering message han
 All services that need to communicate over the WebSocket should use this client.
 """
 
+# Channels that carry chunked transfers. _dispatch reassembles their pages before the handler sees them, so their frames
+# always go through it; on every other channel a process-pool handler gets the raw frame without it being parsed here.
+CHUNKED_CHANNELS = frozenset({Channel.Data.Contracts.value})
+
 
 class WebSocketClient:
-    def __init__(self, logger: FreeTextLogger, name: str):
-        """Initialize the WebSocket client."""
+    def __init__(
+        self,
+        logger: FreeTextLogger,
+        name: str,
+        sharedBufferPollInterval: float = 0.005,
+        pingInterval: Optional[float] = 20.0,
+        pingTimeout: float = 20.0,
+        maxHandlersInFlight: int = 64,
+        threadPoolWorkers: Optional[int] = None,
+        processPoolWorkers: Optional[int] = None,
+        profiling: Optional[ProfilingConfig] = None,
+    ):
+        """
+        Initialize the WebSocket client.
+
+        The server is pinged each pingInterval seconds and the RTT tracked (see healthSnapshot). If it does not answer
+        within pingTimeout the connection is dropped. Pass pingInterval=None to disable this.
+
+        maxHandlersInFlight, threadPoolWorkers and processPoolWorkers apply to handlers registered with a thread or
+        process ExecutionMode (see handlerExecution.py).
+
+        If profiling is given, handler latencies per channel and event-loop lag are recorded (see profilingSnapshot)
+        and slow handlers are logged as warnings.
+        """
         self._logger: FreeTextLogger = logger
         self._name: str = name
         self._websocket: ClientConnection = None
         self._receive_task = None
-        self._messageHandlers: Dict[str, Callable[[Dict], Awaitable[None]]] = {}
+        self._messageHandlers: Dict[str, MessageHandler] = {}
+        self._profiler: Optional[HandlerProfiler] = (
+            HandlerProfiler(profiling) if profiling else None
+        )
+        self._profilerTask = None
+        self._handlerExecutor = HandlerExecutor(
+            self._onHandlerError,
+            maxHandlersInFlight,
+            threadPoolWorkers,
+            processPoolWorkers,
+            self._onHandled if self._profiler else None,
+        )
+        self._tickerBuffer: Optional[SharedTickerBuffer] = None
+        self._tickerBufferTask = None
+        self._subscriptions: Set[str] = set()
+        self._sharedBufferPollInterval = sharedBufferPollInterval
+        self._chunkHandlers: Dict[str, Callable[[Dict], Awaitable[None]]] = {}
+        self._chunkAssembler = ChunkAssembler()
+        self._tickerDeltaDecoder = TickerDeltaDecoder()
+        self._healthMonitor: Optional[ConnectionHealthMonitor] = None
+        self._healthTask = None
+        if pingInterval is not None:
+            self._healthMonitor = ConnectionHealthMonitor(
+                pingInterval, pingTimeout, self._onServerUnresponsive
+            )
 
     def registerMessageHandlers(
+        self,
+        handlers: Dict[str, Union[Callable[[Dict], Awaitable[None]], MessageHandler]],
+    ):
+        """
+        Register handlers for specific message channels. Plain callables run inline on the event loop; wrap a handler
+        in MessageHandler to run it in a thread or process pool instead.
+        """
+        self._messageHandlers = {
+            channel: (
+                handler
+                if isinstance(handler, MessageHandler)
+                else MessageHandler(handler)
+            )
+            for channel, handler in handlers.items()
+        }
+
+    def registerChunkHandlers(
         self, handlers: Dict[str, Callable[[Dict], Awaitable[None]]]
     ):
-        """Register handlers for specific message channels."""
-        self._messageHandlers = handlers
+        """
+        Register handlers that receive each page of a chunked transfer (e.g. QualifiedContractChunk) as it arrives.
+        The channel's regular message handler still receives the reassembled message once all pages are in.
+        """
+        self._chunkHandlers = handlers
 
     async def subscribeToChannels(self, channels: List[Channel]):
         """Subscribe to multiple channels concurrently."""
@@ -42,15 +124,56 @@ class WebSocketClient:
                 action=SubscriptionAction.SUBSCRIBE.value, channel=channel.value
             )
         )
+        self._subscriptions.add(channel.value)
         self._logger.logSuccessful(
             lambda: f"{self._name} subscribed to {channel.value}"
         )
 
-    async def connect(self, uri: str, token: str):
-        """Establish a WebSocket connection and start receiving messages."""
+    async def unsubscribeFromChannel(self, channel: Channel):
+        """Unsubscribe from a single channel."""
+        await self.send(
+            SubscriptionDto(
+                action=SubscriptionAction.UNSUBSCRIBE.value, channel=channel.value
+            )
+        )
+        self._subscriptions.discard(channel.value)
+        self._logger.logSuccessful(
+            lambda: f"{self._name} unsubscribed from {channel.value}"
+        )
+
+    async def connect(
+        self,
+        uri: str,
+        token: str,
+        sharedTickerBufferName: Optional[str] = None,
+        unixPath: Optional[str] = None,
+    ):
+        """
+        Establish a WebSocket connection and start receiving messages.
+
+        If unixPath is given, the connection is made through that Unix domain socket; uri is then only used for the
+        handshake (e.g. "ws://localhost").
+
+        If sharedTickerBufferName is given and the server is on this host, tickers are read from the server's
+        shared-memory buffer instead of the socket. Falls back to the socket if the buffer is unavailable.
+        """
+        isLocal = unixPath is not None or isLocalHost(
+            urllib.parse.urlparse(uri).hostname
+        )
+        if sharedTickerBufferName and isLocal:
+            self._attachTickerBuffer(sharedTickerBufferName)
         try:
             uri = f"{uri}?token={token}&name={self._name}"
-            self._websocket = await websockets.connect(uri)
+            if self._tickerBuffer:
+                uri += "&shm=1"
+            # Our health monitor replaces the websockets keepalive pings
+            keepalive = {"ping_interval": None} if self._healthMonitor else {}
+            if unixPath is not None:
+                self._websocket = await websockets.unix_connect(
+                    unixPath, uri, **keepalive
+                )
+            else:
+                self._websocket = await websockets.connect(uri, **keepalive)
         except Exception as e:
             self._logger.logError(
                 lambda: f"{self._name} Error connecting to WebSocket server. "
@@ -62,6 +185,54 @@ class WebSocketClient:
         )
         # Start receiving messages in the background
         self._receive_task = asyncio.create_task(self._receive())
+        if self._tickerBuffer:
+            self._tickerBufferTask = asyncio.create_task(self._receiveTickerBuffer())
+        if self._healthMonitor:
+            self._healthMonitor.track(self._websocket, self._name)
+            self._healthTask = asyncio.create_task(self._healthMonitor.run())
+        if self._profiler and self._profiler.config.loopLagIntervalSeconds:
+            self._profilerTask = asyncio.create_task(
+                self._profiler.runLoopLagProbe(self._onSlowLoopLag)
+            )
+
+    async def _onServerUnresponsive(self, websocket: ClientConnection):
+        """Drop the connection to a server that stopped answering pings; the receive task then ends."""
+        self._logger.logError(
+            lambda: f"{self._name} Server did not answer ping within {self._healthMonitor.pingTimeout}s. Disconnecting."
+        )
+        websocket.transport.abort()
+
+    def healthSnapshot(self) -> Dict[str, Any]:
+        """RTT stats for the server connection. Empty if health monitoring is disabled."""
+        return self._healthMonitor.snapshot() if self._healthMonitor else {}
+
+    def profilingSnapshot(self) -> Dict[str, Any]:
+        """Handler latency histograms and slow calls per channel, and event-loop lag. Empty if profiling is disabled."""
+        return self._profiler.snapshot() if self._profiler else {}
+
+    def _onHandled(self, channel: str, seconds: float):
+        if self._profiler.record(channel, seconds):
+            self._logger.logWarning(
+                lambda: f"{self._name} Slow handler for {channel}: {seconds * 1000:.1f} ms"
+            )
+
+    def _onSlowLoopLag(self, lag: float):
+        self._logger.logWarning(
+            lambda: f"{self._name} Event loop lagging: woke up {lag * 1000:.1f} ms late"
+        )
+
+    def _attachTickerBuffer(self, name: str):
+        """Attach to the server's shared-memory ticker buffer, if it exists."""
+        try:
+            self._tickerBuffer = SharedTickerBuffer.attach(name)
+        except (FileNotFoundError, ValueError) as e:
+            self._logger.logError(
+                lambda: f"{self._name} Shared ticker buffer unavailable, using the socket instead: {e}"
+            )
+            return
+        self._logger.logSuccessful(
+            lambda: f"{self._name} attached to shared ticker buffer {name}"
+        )
 
     async def send(self, dto: MessageDto):
         """Send a message over the WebSocket connection."""
@@ -69,7 +240,8 @@ class WebSocketClient:
             message = dto.model_dump_json()
             if self._websocket:
                 await self._websocket.send(message)
-                self._logger.logDebug(lambda: f"{self._name} sent: {message}")
+                if self._logger.logLevel == LogLevel.DEBUG:  # Skip building the lambda
+                    self._logger.logDebug(lambda: f"{self._name} sent: {message}")
             else:
                 self._logger.logError(
                     lambda: f"{self._name} WebSocket not connected. Message not sent."
@@ -78,8 +250,37 @@ class WebSocketClient:
             self._logger.logError(lambda: f"{self._name} Error sending message: {e}")
             raise
 
+    async def sendChunks(self, chunks: List[MessageDto]):
+        """
+        Send the pages of a chunked transfer (e.g. from QualifiedContractList.createChunks). Yields to the event loop
+        between pages so other messages on this connection are not held up behind a large transfer.
+        """
+        for chunk in chunks:
+            await self.send(chunk)
+            await asyncio.sleep(0)
+
+    async def drainHandlers(self):
+        """Wait until every message handed to a thread or process pool handler has been handled."""
+        await self._handlerExecutor.drain()
+
     async def close(self):
-        """Close the WebSocket connection and cancel background tasks."""
+        """
+        Close the WebSocket connection and cancel background tasks. Messages already handed to thread or process pool
+        handlers are handled before the pools are shut down.
+        """
+        if self._healthTask and not self._healthTask.done():
+            self._healthTask.cancel()
+        if self._profilerTask and not self._profilerTask.done():
+            self._profilerTask.cancel()
+        if self._tickerBufferTask and not self._tickerBufferTask.done():
+            self._tickerBufferTask.cancel()
+            try:
+                await self._tickerBufferTask
+            except asyncio.CancelledError:
+                pass
+        if self._tickerBuffer:
+            self._tickerBuffer.close()
+            self._tickerBuffer = None
         if self._receive_task and not self._receive_task.done():
             self._receive_task.cancel()
             try:
@@ -90,6 +291,9 @@ class WebSocketClient:
                 self._logger.logSuccessful(
                     lambda: f"{self._name} Receive task successfully cancelled."
                 )
+        # Before closing the socket, since onResult callbacks may still send
+        await self._handlerExecutor.drain()
+        self._handlerExecutor.shutdown()
         if self._websocket and self._websocket.state <= 1:  # CONNECTING or OPEN
             await self._websocket.close()
             self._logger.logSuccessful(
@@ -100,19 +304,19 @@ class WebSocketClient:
         """Background task to receive and handle incoming messages."""
         try:
             async for message in self._websocket:
-                self._logger.logDebug(lambda: f"{self._name} received: {message}")
-                data = json.loads(message)
-                channel = data.get("channel")
+                if self._logger.logLevel == LogLevel.DEBUG:  # Skip building the lambda
+                    self._logger.logDebug(lambda: f"{self._name} received: {message}")
+                channel = peekChannel(message)
                 handler = self._messageHandlers.get(channel)
-                if handler:
-                    if asyncio.iscoroutinefunction(handler):
-                        await handler(data)
-                    else:
-                        handler(data)
-                else:
-                    self._logger.logError(
-                        lambda: f"No handler registered for channel: {channel}"
-                    )
+                if (
+                    handler
+                    and handler.mode == ExecutionMode.PROCESS
+                    and channel not in CHUNKED_CHANNELS
+                ):
+                    # The worker process parses the frame; skip parsing it here
+                    await self._handlerExecutor.run(handler, channel, raw=message)
+                    continue
+                await self._dispatch(json.loads(message))
         except asyncio.CancelledError:
             self._logger.logError(
                 lambda: f"{self._name} Receiving messages task cancelled."
@@ -124,6 +328,70 @@ class WebSocketClient:
             )
             raise
 
+    async def _receiveTickerBuffer(self):
+        """
+        Background task to poll the shared-memory ticker buffer and hand new tickers to the tickers handler. As on the
+        socket, tickers are only delivered while subscribed to dat@tickers, and never the client's own.
+        """
+        while True:
+            if Channel.Data.Tickers.value not in self._subscriptions:
+                self._tickerBuffer.skipToLatest()
+                tickers = None
+            else:
+                tickers = self._tickerBuffer.read(excludeSource=self._name)
+            if tickers:
+                await self._dispatch(
+                    {"channel": Channel.Data.Tickers.value, "tickers": tickers}
+                )
+            await asyncio.sleep(self._sharedBufferPollInterval)
+
+    async def _dispatch(self, data: Dict):
+        """Call the handler registered for the message's channel."""
+        channel = data.get("channel")
+        if "transferId" in data:
+            # The assembler validates the page first, so page handlers never see an invalid one
+            try:
+                assembled = self._chunkAssembler.add(data)
+            except ValueError as e:
+                self._logger.logError(
+                    lambda: f"{self._name} Dropped chunked transfer on {channel}: {e}"
+                )
+                return
+            await self._call(self._chunkHandlers.get(channel), data)
+            if assembled is None:
+                return  # Wait for the remaining pages
+            data = assembled
+        if (
+            channel == Channel.Data.TickerDeltas
+            and channel not in self._messageHandlers
+        ):
+            tickers = self._tickerDeltaDecoder.apply(data)
+            if tickers is None:
+                return  # Wait for a keyframe
+            channel = Channel.Data.Tickers.value
+            data = {"channel": channel, "tickers": tickers}
+        handler = self._messageHandlers.get(channel)
+        if handler:
+            await self._handlerExecutor.run(handler, channel, data)
+        else:
+            self._logger.logError(
+                lambda: f"No handler registered for channel: {channel}"
+            )
+
+    def _onHandlerError(self, channel: str, e: BaseException):
+        self._logger.logError(
+            lambda: f"{self._name} Handler for {channel} failed: {exceptionToStr(e)}"
+        )
+
+    @staticmethod
+    async def _call(handler: Optional[Callable], data: Dict):
+        if handler is None:
+            return
+        if asyncio.iscoroutinefunction(handler):
+            await handler(data)
+        else:
+            handler(data)
+
 
 if __name__ == "__main__":
     import argparse
@@ -2,14 +2,29 @@ import asyncio
 import websockets
 from websockets.asyncio.server import ServerConnection
 from websockets.http11 import Request, Response, Headers
+from websockets.protocol import State
 from jgmd.logging import FreeTextLogger, LogLevel, Color
 from pydantic import ValidationError
-from typing import Any, Dict, Set, List
-from collections import defaultdict
+from typing import Any, Callable, Deque, Dict, Set, List, Optional, Tuple
+from collections import defaultdict, deque
 from datetime import datetime, timedelta
 import json
+import math
+import time
 import urllib.parse
-from ..models import SubscriptionDto, SubscriptionAction
+import uuid
+from ..models import SubscriptionDto, SubscriptionAction, Channel, MessageDto
+from .sharedTickerBuffer import SharedTickerBuffer
+from .flowControl import (
+    FlowControlConfig,
+    FlowController,
+    isDataChannel,
+    shedOldestDataFrame,
+)
+from .messageProcessor import MessageProcessor
+from .connectionHealth import ConnectionHealthMonitor
+from .ingressValidation import IngressValidationConfig, IngressValidator
+from .relay import RELAY_PATH_HEADER, RelayConfig, UpstreamRelay
 
 """
 The WebSocket server is responsible for accepting incoming client connections, managing client subscriptions to
@@ -19,17 +34,93 @@ channels, and broadcasting messages to subscribed clients.
 
 class WebSocketServer:
     def __init__(
-        self, logger: FreeTextLogger, secretToken: str, maxMessagesPerMinute: int
+        self,
+        logger: FreeTextLogger,
+        secretToken: str,
+        maxMessagesPerMinute: int,
+        sharedTickerBufferName: Optional[str] = None,
+        sharedTickerBufferCapacity: int = 65536,
+        flowControl: Optional[FlowControlConfig] = None,
+        processors: Optional[List[MessageProcessor]] = None,
+        processorTickSeconds: float = 1.0,
+        pingInterval: Optional[float] = 20.0,
+        pingTimeout: float = 20.0,
+        ingressValidation: Optional[IngressValidationConfig] = None,
+        upstream: Optional[RelayConfig] = None,
+        nodeId: Optional[str] = None,
+        relayToken: Optional[str] = None,
     ):
-        """Initialize the WebSocket server."""
+        """
+        Initialize the WebSocket server.
+
+        If sharedTickerBufferName is given, ticker data is also written to a shared-memory ring buffer of that name.
+        Same-host clients that attach to it receive tickers from shared memory instead of over the socket.
+
+        If flowControl is given, clients over budget are throttled and then have their oldest data frames shed rather
+        than being disconnected (see flowControl.py). Otherwise a client exceeding maxMessagesPerMinute is closed.
+
+        processors (e.g. BarAggregator) see every broadcast message and publish derived messages on their own channels. A
+        processor that raises is logged and skipped; the message is still delivered.
+
+        Every client is pinged each pingInterval seconds; its RTT is tracked (see health_snapshot) and it is evicted
+        if it does not answer within pingTimeout. Clients whose reads are paused by flow control are not evicted. Pass
+        pingInterval=None to disable this.
+
+        ingressValidation sets per-channel policies for validating published messages against their MessageDto before
+        they are broadcast (see ingressValidation.py). Without it, messages are forwarded unvalidated.
+
+        If upstream is given, the server relays: it subscribes to the upstream server for the channels its clients
+        subscribe to, fans the upstream's messages out locally and forwards its clients' messages upstream (see
+        relay.py). nodeId identifies the server to other relays and defaults to a random id.
+
+        Other servers can relay this one only if relayToken is set: they connect with it instead of secretToken. Such
+        relays are exempt from maxMessagesPerMinute and flowControl, since each carries many clients.
+        """
         self.logger = logger
         self.channel_subscriptions: Dict[str, Set[ServerConnection]] = {}
         self.secretToken = secretToken
+        self.relayToken = relayToken
         self.maxMessagesPerMinute = (
             maxMessagesPerMinute  # Rate limit per client per minute
         )
         self.message_counts: Dict[ServerConnection, List[datetime]] = defaultdict(list)
         self.client_names: Dict[ServerConnection, str] = {}  # Store client names
+        self.sharedTickerBufferName = sharedTickerBufferName
+        self.sharedTickerBufferCapacity = sharedTickerBufferCapacity
+        self.ticker_buffer: Optional[SharedTickerBuffer] = None
+        # Clients that read tickers from the shared-memory buffer rather than the socket
+        self.shared_buffer_clients: Set[ServerConnection] = set()
+        self.flow_controller: Optional[FlowController] = None
+        if flowControl is not None:
+            if flowControl.maxMessagesPerMinute is None:
+                flowControl = flowControl.model_copy(
+                    update={"maxMessagesPerMinute": maxMessagesPerMinute}
+                )
+            self.flow_controller = FlowController(flowControl)
+        self.processors: List[MessageProcessor] = processors or []
+        self.processorTickSeconds = processorTickSeconds
+        self.health_monitor: Optional[ConnectionHealthMonitor] = None
+        if pingInterval is not None:
+            self.health_monitor = ConnectionHealthMonitor(
+                pingInterval, pingTimeout, self.evict_client
+            )
+        self.ingress_validator: Optional[IngressValidator] = (
+            IngressValidator(ingressValidation) if ingressValidation else None
+        )
+        self.nodeId = nodeId or uuid.uuid4().hex[:8]
+        # Node ids of our upstream, its upstream, ...
+        self.upstream_path: List[str] = []
+        # Relays connected to this server, and their node ids
+        self.relay_clients: Dict[ServerConnection, str] = {}
+        self.relay: Optional[UpstreamRelay] = None
+        if upstream is not None:
+            self.relay = UpstreamRelay(
+                upstream,
+                self.nodeId,
+                logger,
+                self.handle_upstream_message,
+                self.handle_upstream_path,
+            )
 
     async def process_request(
         self, websocket: ServerConnection, request: Request
@@ -39,7 +130,13 @@ class WebSocketServer:
         params = urllib.parse.parse_qs(query)
         token = params.get("token", [None])[0]
         name = params.get("name", [None])[0]
-        if token != self.secretToken or not name:
+        relayNode = params.get("relayNode", [None])[0]
+        # Relays are trusted with more than clients, so they need their own token
+        if relayNode:
+            authorized = self.relayToken is not None and token == self.relayToken
+        else:
+            authorized = token == self.secretToken
+        if not authorized or not name:
             self.logger.logError(
                 lambda: f"Unauthorized or unnamed client: {websocket.remote_address}"
             )
@@ -48,17 +145,100 @@ class WebSocketServer:
                 "Unauthorized/Invalid token or missing client name",
                 Headers([("Content-Type", "text/plain")]),
             )
+        if relayNode and (relayNode == self.nodeId or relayNode in self.upstream_path):
+            self.logger.logError(
+                lambda: f"Refusing relay {relayNode}: it is upstream of this node"
+            )
+            return Response(
+                409, "Relay loop", Headers([("Content-Type", "text/plain")])
+            )
         self.client_names[websocket] = name
+        if relayNode:
+            self.relay_clients[websocket] = relayNode
+        if self.ticker_buffer and params.get("shm", [None])[0] == "1":
+            self.shared_buffer_clients.add(websocket)
+
+    def process_response(
+        self, websocket: ServerConnection, request: Request, response: Response
+    ):
+        """Tell relays this node's path, so they can detect loops."""
+        if websocket in self.relay_clients:
+            response.headers[RELAY_PATH_HEADER] = ",".join(
+                [self.nodeId] + self.upstream_path
+            )
 
-    async def start(self, host: str = "localhost", port: int = 8765):
-        """Start the WebSocket server."""
-        server = await websockets.serve(
-            self.handle_client, host, port, process_request=self.process_request
+    async def start(
+        self,
+        host: str = "localhost",
+        port: Optional[int] = 8765,
+        unixPath: Optional[str] = None,
+    ):
+        """
+        Start the WebSocket server.
+
+        Listens on TCP host:port, on the Unix domain socket at unixPath, or on both. Pass port=None to listen on the
+        Unix socket only.
+        """
+        if port is None and unixPath is None:
+            raise ValueError("Provide a TCP port, a Unix socket path, or both")
+        if self.sharedTickerBufferName:
+            self.ticker_buffer = SharedTickerBuffer.create(
+                self.sharedTickerBufferName, self.sharedTickerBufferCapacity
+            )
+            self.logger.logSuccessful(
+                lambda: f"Shared ticker buffer created: {self.sharedTickerBufferName}"
+            )
+        tickTask = (
+            asyncio.create_task(self.tick_processors()) if self.processors else None
         )
-        self.logger.logSuccessful(
-            lambda: f"WebSocket server started on ws://{host}:{port}"
+        healthTask = (
+            asyncio.create_task(self.health_monitor.run())
+            if self.health_monitor
+            else None
         )
-        await server.wait_closed()
+        relayTask = asyncio.create_task(self.relay.run()) if self.relay else None
+        # Our health monitor replaces the websockets keepalive pings
+        keepalive = {"ping_interval": None} if self.health_monitor else {}
+        try:
+            servers = []
+            if port is not None:
+                servers.append(
+                    await websockets.serve(
+                        self.handle_client,
+                        host,
+                        port,
+                        process_request=self.process_request,
+                        process_response=self.process_response,
+                        **keepalive,
+                    )
+                )
+                self.logger.logSuccessful(
+                    lambda: f"WebSocket server started on ws://{host}:{port}"
+                )
+            if unixPath is not None:
+                servers.append(
+                    await websockets.unix_serve(
+                        self.handle_client,
+                        unixPath,
+                        process_request=self.process_request,
+                        process_response=self.process_response,
+                        **keepalive,
+                    )
+                )
+                self.logger.logSuccessful(
+                    lambda: f"WebSocket server started on unix socket {unixPath}"
+                )
+            await asyncio.gather(*(server.wait_closed() for server in servers))
+        finally:
+            if tickTask:
+                tickTask.cancel()
+            if healthTask:
+                healthTask.cancel()
+            if relayTask:
+                relayTask.cancel()
+            if self.ticker_buffer:
+                self.ticker_buffer.close()
+                self.ticker_buffer = None
 
     async def handle_client(self, websocket: ServerConnection):
         """Handle client connections and manage incoming messages."""
@@ -66,36 +246,238 @@ class WebSocketServer:
         self.logger.logSuccessful(
             lambda: f"New client connected: {client_name} ({websocket.remote_address})"
         )
+        if self.health_monitor:
+            self.health_monitor.track(websocket, client_name)
 
         try:
-            async for message in websocket:
-                if not self.allow_message(websocket):
-                    self.logger.logError(
-                        lambda: f"Rate limit exceeded for client {client_name}"
-                    )
-                    await websocket.close(code=4002, reason="Rate limit exceeded")
-                    break
-
-                self.logger.logDebug(
-                    lambda: f"Received message from {client_name}: {message}"
-                )
-                try:
-                    data: Dict = json.loads(message)
-                    if "action" in data:
-                        subscriptionDto = SubscriptionDto(**data)
-                        await self.handle_subscription(subscriptionDto, websocket)
-                    else:
-                        channel = data.get("channel")
-                        await self.handle_broadcast(channel, message, websocket)
-                except ValidationError as e:
-                    await websocket.send(json.dumps({"error": str(e)}))
+            if websocket in self.relay_clients:
+                # A relay forwards messages from all of its clients, each limited on the relay's own node
+                async for message in websocket:
+                    await self.handle_message(message, json.loads(message), websocket)
+            elif self.flow_controller:
+                await self.receive_with_flow_control(websocket, client_name)
+            else:
+                async for message in websocket:
+                    if not self.allow_message(websocket):
+                        self.logger.logError(
+                            lambda: f"Rate limit exceeded for client {client_name}"
+                        )
+                        await websocket.close(code=4002, reason="Rate limit exceeded")
+                        break
+                    await self.handle_message(message, json.loads(message), websocket)
         except websockets.exceptions.ConnectionClosed:
             self.logger.logSuccessful(lambda: f"Client disconnected: {client_name}")
         finally:
             self.remove_client_from_all_channels(websocket)
             self.client_names.pop(websocket, None)
+            self.shared_buffer_clients.discard(websocket)
+            self.relay_clients.pop(websocket, None)
             if websocket in self.message_counts:
                 del self.message_counts[websocket]
+            if self.flow_controller:
+                self.flow_controller.removeClient(websocket)
+            if self.health_monitor:
+                self.health_monitor.untrack(websocket)
+            if self.ingress_validator:
+                self.ingress_validator.removePublisher(websocket)
+
+    async def evict_client(self, websocket: ServerConnection):
+        """Drop a client that stopped answering pings. It receives no more broadcasts, even before its socket closes."""
+        self.logger.logError(
+            lambda: f"Evicting unresponsive client: {self.client_names.get(websocket, 'Unknown')}"
+        )
+        self.remove_client_from_all_channels(websocket)
+        self.shared_buffer_clients.discard(websocket)
+        # A half-open peer will never complete a closing handshake, so drop the connection outright
+        websocket.transport.abort()
+
+    def health_snapshot(self) -> Dict[str, Any]:
+        """Per-client RTT stats and eviction counts. Empty if health monitoring is disabled."""
+        return self.health_monitor.snapshot() if self.health_monitor else {}
+
+    def validation_stats(self) -> Dict[str, Any]:
+        """Validated and rejected message counts per channel and rejects per publisher. Empty if validation is off."""
+        return self.ingress_validator.stats() if self.ingress_validator else {}
+
+    async def handle_message(
+        self, message: str, data: Dict, websocket: ServerConnection
+    ):
+        """Route a single message from a client to the subscription or broadcast handlers."""
+        client_name = self.client_names.get(websocket, "Unknown")
+        self.logger.logDebug(lambda: f"Received message from {client_name}: {message}")
+        try:
+            if "action" in data:
+                subscriptionDto = SubscriptionDto(**data)
+                await self.handle_subscription(subscriptionDto, websocket)
+            else:
+                channel = data.get("channel")
+                if self.ingress_validator:
+                    try:
+                        self.ingress_validator.validate(
+                            websocket, client_name, channel, message
+                        )
+                    except ValidationError:
+                        self.logger.logWarning(
+                            lambda: f"Rejected invalid message from {client_name} on {channel}"
+                        )
+                        raise
+                if self.ticker_buffer and channel == Channel.Data.Tickers:
+                    self.write_ticker_buffer(data, client_name)
+                await self.handle_broadcast(channel, message, websocket)
+                if self.relay:
+                    self.relay.publish(message)
+                if self.processors:
+                    now = time.time()
+                    for processor in self.processors:
+                        await self.run_processor(
+                            processor, processor.process, channel, data, now
+                        )
+        except ValidationError as e:
+            await websocket.send(json.dumps({"error": str(e)}))
+
+    async def handle_upstream_message(self, message: str, data: Dict):
+        """Fan out a message received from the upstream server to local subscribers."""
+        channel = data.get("channel")
+        if self.ticker_buffer and channel == Channel.Data.Tickers:
+            self.write_ticker_buffer(data, None)
+        await self.handle_broadcast(channel, message, None)
+
+    def write_ticker_buffer(self, data: Dict, client_name: Optional[str]):
+        """Write a ticker message to the shared-memory buffer. Bad records are skipped; the message is still broadcast."""
+        try:
+            skipped = self.ticker_buffer.write(data.get("tickers", []), client_name)
+        except Exception as e:  # e.g. tickers is not a list of objects
+            self.logger.logError(
+                lambda: f"Could not write tickers from {client_name} to the shared buffer: {e}"
+            )
+            return
+        if skipped:
+            self.logger.logWarning(
+                lambda: f"Skipped {skipped} malformed ticker(s) from {client_name} in the shared buffer"
+            )
+
+    async def handle_upstream_path(self, path: List[str]) -> bool:
+        """Record the upstream's path and pass ours on to our relays. Returns False if the upstream is downstream of us."""
+        if self.nodeId in path:
+            self.logger.logError(
+                lambda: f"Relay loop: {self.nodeId} is upstream of its upstream ({' -> '.join(path)})"
+            )
+            return False
+        self.upstream_path = path
+        message = json.dumps({"relayPath": [self.nodeId] + path})
+        for client in list(self.relay_clients):
+            if client.state != State.OPEN:
+                continue  # Still in its handshake, which carries the new path
+            try:
+                await client.send(message)
+            except websockets.exceptions.ConnectionClosed:
+                pass
+        return True
+
+    async def receive_with_flow_control(
+        self, websocket: ServerConnection, client_name: str
+    ):
+        """
+        Read a client's messages into a bounded inbox and process them within its budgets.
+        Over budget: delay processing, then pause reads, then shed the oldest data frames, and only disconnect as a
+        last resort.
+        """
+        config = self.flow_controller.config
+        inbox: Deque[Optional[Tuple[str, Dict]]] = deque()
+        hasFrames = asyncio.Event()
+        hasSpace = asyncio.Event()
+
+        async def read():
+            try:
+                async for message in websocket:
+                    paused = len(inbox) >= config.maxQueuedFrames
+                    if paused and self.health_monitor:
+                        # Pongs aren't read while reads are paused; don't evict the client for that
+                        self.health_monitor.suspend(websocket)
+                    while len(inbox) >= config.maxQueuedFrames:
+                        # Inbox full: stop reading so the publisher feels backpressure
+                        hasSpace.clear()
+                        try:
+                            await asyncio.wait_for(
+                                hasSpace.wait(), config.shedAfterSeconds
+                            )
+                        except asyncio.TimeoutError:
+                            if shedOldestDataFrame(inbox):
+                                self.flow_controller.shedFrames += 1
+                                self.logger.logWarning(
+                                    lambda: f"Shedding oldest data frame from {client_name}"
+                                )
+                    if paused and self.health_monitor:
+                        self.health_monitor.resume(websocket)
+                    inbox.append((message, json.loads(message)))
+                    hasFrames.set()
+            finally:
+                inbox.append(None)  # Tell the processor the connection is done
+                hasFrames.set()
+
+        reader = asyncio.create_task(read())
+        throttledSince: Optional[float] = None
+        try:
+            while True:
+                if not inbox:
+                    hasFrames.clear()
+                    await hasFrames.wait()
+                    continue
+                if inbox[0] is None:
+                    break
+                message, data = inbox[0]
+                channel = None if "action" in data else data.get("channel")
+                delay = self.flow_controller.delay(websocket, channel, len(message))
+                if delay > 0:
+                    now = self.flow_controller.clock()
+                    if throttledSince is None:
+                        throttledSince = now
+                        self.flow_controller.throttleEvents += 1
+                        self.logger.logWarning(
+                            lambda: f"Throttling client {client_name}: over budget"
+                        )
+                    if now - throttledSince > config.disconnectAfterSeconds:
+                        self.flow_controller.disconnects += 1
+                        self.logger.logError(
+                            lambda: f"Rate limit exceeded for client {client_name}"
+                        )
+                        await websocket.close(code=4002, reason="Rate limit exceeded")
+                        break
+                    if math.isinf(delay):
+                        # Larger than the whole byte budget: it can never be delivered
+                        inbox.popleft()
+                        hasSpace.set()
+                        if isDataChannel(channel):
+                            self.flow_controller.shedFrames += 1
+                            self.logger.logWarning(
+                                lambda: f"Shedding data frame from {client_name}: larger than its byte budget"
+                            )
+                            continue
+                        # Control frames are never dropped silently
+                        self.flow_controller.rejectedFrames += 1
+                        self.logger.logError(
+                            lambda: f"Rejecting frame from {client_name}: larger than its byte budget"
+                        )
+                        error = (
+                            f"Message of {len(message)} bytes exceeds the byte budget"
+                        )
+                        await websocket.send(json.dumps({"error": error}))
+                        continue
+                    # Re-check at least once a second; the reader may shed the head frame meanwhile
+                    await asyncio.sleep(min(delay, 1.0))
+                    continue
+                throttledSince = None
+                inbox.popleft()
+                hasSpace.set()
+                self.flow_controller.record(websocket, channel, len(message))
+                await self.handle_message(message, data, websocket)
+        finally:
+            if not reader.done():
+                reader.cancel()
+        try:
+            await reader
+        except asyncio.CancelledError:
+            pass
 
     def allow_message(self, websocket: ServerConnection) -> bool:
         """Check if a client is within the allowed message rate."""
@@ -120,12 +502,49 @@ class WebSocketServer:
             lambda: f"Broadcasting message from {sender_name}: {msg}", Color.CYAN
         )
         if channel in self.channel_subscriptions:
-            for client in self.channel_subscriptions[channel]:
+            skipSharedBufferClients = (
+                self.ticker_buffer is not None and channel == Channel.Data.Tickers
+            )
+            # Copy: subscriptions can change while a send is awaited
+            for client in list(self.channel_subscriptions[channel]):
                 try:
+                    if skipSharedBufferClients and client in self.shared_buffer_clients:
+                        continue  # Already delivered through shared memory
                     if client != sender:
                         await client.send(msg)
                 except websockets.exceptions.ConnectionClosed:
-                    self.unsubscribe_client(channel, client)
+                    self.remove_client_from_all_channels(client)
+
+    async def publish_derived(self, dtos: List[MessageDto]):
+        """Broadcast messages produced by processors. Nothing is serialized for channels without subscribers."""
+        for dto in dtos:
+            channel = dto.channel.value
+            if channel in self.channel_subscriptions:
+                await self.handle_broadcast(channel, dto.model_dump_json(), None)
+
+    async def run_processor(
+        self,
+        processor: MessageProcessor,
+        method: Callable[..., List[MessageDto]],
+        *args,
+    ):
+        """Publish a processor's output. A failing processor is logged without affecting the publisher or the others."""
+        try:
+            dtos = method(*args)
+        except Exception as e:
+            self.logger.logError(
+                lambda: f"Processor {type(processor).__name__} failed: {e!r}"
+            )
+            return
+        await self.publish_derived(dtos)
+
+    async def tick_processors(self):
+        """Background task that lets processors publish time-based output (e.g. bars closing without new ticks)."""
+        while True:
+            await asyncio.sleep(self.processorTickSeconds)
+            now = time.time()
+            for processor in self.processors:
+                await self.run_processor(processor, processor.tick, now)
 
     async def handle_subscription(
         self, dto: SubscriptionDto, websocket: ServerConnection
@@ -138,8 +557,10 @@ class WebSocketServer:
 
     def subscribe_client(self, channel: str, websocket: ServerConnection):
         """Add a client to a channel."""
-        if channel not in self.channel_subscriptions:
+        if not self.channel_subscriptions.get(channel):
             self.channel_subscriptions[channel] = set()
+            if self.relay:
+                self.relay.subscribe(channel)  # First local subscriber
         self.channel_subscriptions[channel].add(websocket)
         self.logger.logSuccessful(
             lambda: f"{self.client_names[websocket]} subscribed to {channel}"
@@ -151,6 +572,8 @@ class WebSocketServer:
             self.channel_subscriptions[channel].discard(websocket)
             if not self.channel_subscriptions[channel]:
                 del self.channel_subscriptions[channel]
+                if self.relay:
+                    self.relay.unsubscribe(channel)  # Last local subscriber left
         self.logger.logSuccessful(
             lambda: f"{self.client_names[websocket]} unsubscribed from {channel}"
         )
@@ -161,6 +584,8 @@ class WebSocketServer:
             if websocket not in subscribers:
                 continue
             subscribers.remove(websocket)
+            if not subscribers and self.relay:
+                self.relay.unsubscribe(channel)
             self.logger.logSuccessful(
                 lambda: f"{self.client_names[websocket]} unsubscribed from {channel}"
             )
@@ -0,0 +1,118 @@
+import asyncio
+from jgib.websocket import (
+    Channel,
+    BarList,
+    BarAggregator,
+    MessageProcessor,
+    TickerDto,
+    TickerList,
+    WebSocketClient,
+    WebSocketServer,
+)
+from jgmd.logging import FreeTextLogger, LogLevel
+
+logger = FreeTextLogger("./logs", "debug.log", LogLevel.INFO, printToConsole=False)
+token = "test_secret"
+
+
+def tickers(*pairs):
+    return {
+        "channel": "dat@tickers",
+        "tickers": [{"conId": c, "symbol": "X", "last": p} for c, p in pairs],
+    }
+
+
+def test_bars_are_published_when_the_bucket_rolls_over():
+    aggregator = BarAggregator([Channel.Data.Bars1m])
+    assert aggregator.process("dat@tickers", tickers((1, 10.0), (2, 5.0)), 60.5) == []
+    assert aggregator.process("dat@tickers", tickers((1, 12.0)), 70) == []
+    assert aggregator.process("dat@tickers", tickers((1, 9.0), (1, 11.0)), 119) == []
+
+    (bars,) = aggregator.process("dat@tickers", tickers((1, 20.0)), 120)
+    assert isinstance(bars, BarList)
+    assert bars.channel == Channel.Data.Bars1m
+    assert (bars.start, bars.interval) == (60, 60)
+    assert [b.model_dump() for b in bars.bars] == [
+        {"conId": 1, "open": 10.0, "high": 12.0, "low": 9.0, "close": 11.0, "count": 4},
+        {"conId": 2, "open": 5.0, "high": 5.0, "low": 5.0, "close": 5.0, "count": 1},
+    ]
+
+
+def test_tick_closes_bars_without_new_tickers_and_ignores_missing_prices():
+    aggregator = BarAggregator([Channel.Data.Bars1s, Channel.Data.Bars5m])
+    aggregator.process("dat@tickers", tickers((1, 10.0), (2, float("nan"))), 0.2)
+    assert aggregator.process("cmd@ibClient", {"channel": "cmd@ibClient"}, 5) == []
+    (bars,) = aggregator.tick(1.0)
+    assert bars.channel == Channel.Data.Bars1s
+    assert [b.conId for b in bars.bars] == [1]
+    assert aggregator.tick(2.0) == []
+    (bars,) = aggregator.tick(300.0)
+    assert bars.channel == Channel.Data.Bars5m
+
+
+def test_malformed_records_are_skipped():
+    aggregator = BarAggregator([Channel.Data.Bars1s])
+    frame = {
+        "channel": "dat@tickers",
+        "tickers": [
+            {"conId": 1, "last": "10.5"},
+            {"symbol": "X", "last": 10.0},
+            {"conId": "2", "last": 10.0},
+            {"conId": 2**70, "last": 10.0},
+            None,
+            {"conId": 3, "last": 7.0},
+        ],
+    }
+    assert aggregator.process("dat@tickers", frame, 0.5) == []
+    (bars,) = aggregator.tick(1.0)
+    assert [b.conId for b in bars.bars] == [3]
+    assert aggregator.skippedRecords == 5
+
+
+class _FailingProcessor(MessageProcessor):
+    def process(self, channel, data, now):
+        raise RuntimeError("boom")
+
+
+def test_failing_processor_does_not_drop_the_publisher():
+    async def main():
+        server = WebSocketServer(
+            logger,
+            secretToken=token,
+            maxMessagesPerMinute=100,
+            processors=[_FailingProcessor(), BarAggregator([Channel.Data.Bars1s])],
+            processorTickSeconds=0.2,
+            pingInterval=None,
+        )
+        serverTask = asyncio.create_task(server.start("localhost", 8781))
+        await asyncio.sleep(0.2)
+        tickers, bars = [], []
+        subscriber = WebSocketClient(logger=logger, name="Subscriber")
+        publisher = WebSocketClient(logger=logger, name="Publisher")
+        try:
+            await subscriber.connect("ws://localhost:8781", token=token)
+            await publisher.connect("ws://localhost:8781", token=token)
+            subscriber.registerMessageHandlers(
+                {
+                    Channel.Data.Tickers: lambda data: tickers.extend(data["tickers"]),
+                    Channel.Data.Bars1s: lambda data: bars.extend(data["bars"]),
+                }
+            )
+            await subscriber.subscribeToChannel(Channel.Data.Tickers)
+            await subscriber.subscribeToChannel(Channel.Data.Bars1s)
+            await asyncio.sleep(0.1)
+            for price in (1.0, 2.0):
+                await publisher.send(
+                    TickerList.create([TickerDto(conId=1, symbol="A", last=price)])
+                )
+            await asyncio.sleep(1.5)
+            return len(tickers), bars, len(server.client_names)
+        finally:
+            await subscriber.close()
+            await publisher.close()
+            serverTask.cancel()
+
+    tickerCount, bars, clients = asyncio.run(main())
+    assert tickerCount == 2
+    assert bars and bars[0]["conId"] == 1
+    assert clients == 2
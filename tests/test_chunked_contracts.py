@@ -0,0 +1,116 @@
+import asyncio
+import json
+import pytest
+from jgib.websocket.models import (
+    Channel,
+    QualifiedContractDto,
+    QualifiedContractList,
+    QualifiedContractChunk,
+)
+from jgib.websocket.services.chunkAssembler import ChunkAssembler
+from jgib.websocket.services.websocketClient import WebSocketClient
+from jgmd.logging import FreeTextLogger, LogLevel
+
+logger = FreeTextLogger("./logs", "debug.log", LogLevel.INFO, printToConsole=False)
+
+
+def contracts(count):
+    return [
+        QualifiedContractDto(conId=i, symbol=f"SYM{i}", secType="OPT", exchange="SMART")
+        for i in range(count)
+    ]
+
+
+def test_create_chunks_pages_contracts():
+    chunks = QualifiedContractList.createChunks(contracts(5), chunkSize=2)
+    assert [len(c.contracts) for c in chunks] == [2, 2, 1]
+    assert {c.transferId for c in chunks} == {chunks[0].transferId}
+    assert [(c.chunkIndex, c.totalChunks) for c in chunks] == [(0, 3), (1, 3), (2, 3)]
+    assert all(c.channel == Channel.Data.Contracts for c in chunks)
+    assert len(QualifiedContractList.createChunks([], chunkSize=2)) == 1
+
+
+def test_assembler_handles_out_of_order_duplicate_and_stale_pages():
+    now = [0.0]
+    assembler = ChunkAssembler(maxAgeSeconds=10, clock=lambda: now[0])
+    pages = [
+        json.loads(c.model_dump_json())
+        for c in QualifiedContractList.createChunks(contracts(3), chunkSize=1)
+    ]
+    assert assembler.add(pages[2]) is None
+    assert assembler.add(pages[2]) is None
+    assert assembler.add(pages[0]) is None
+    assembled = assembler.add(pages[1])
+    assert QualifiedContractList(**assembled) == QualifiedContractList.create(
+        contracts(3)
+    )
+    assert assembler.pendingTransfers == 0
+
+    assembler.add(pages[0])
+    now[0] = 11
+    assembler.add(
+        json.loads(
+            QualifiedContractList.createChunks(contracts(2), 1)[0].model_dump_json()
+        )
+    )
+    assert assembler.pendingTransfers == 1
+
+
+def test_assembler_drops_transfers_with_invalid_pages():
+    assembler = ChunkAssembler(maxChunks=10)
+    pages = [
+        json.loads(c.model_dump_json())
+        for c in QualifiedContractList.createChunks(contracts(3), chunkSize=1)
+    ]
+    assert assembler.add(pages[0]) is None
+    for bad in ({"chunkIndex": 3}, {"chunkIndex": -1}, {"chunkIndex": "1"}):
+        with pytest.raises(ValueError):
+            assembler.add({**pages[1], **bad})
+        assert assembler.pendingTransfers == 0
+        assert assembler.add(pages[0]) is None
+    with pytest.raises(ValueError):
+        assembler.add({**pages[1], "totalChunks": 4, "chunkIndex": 3})
+    assert assembler.pendingTransfers == 0
+    for bad in ({"totalChunks": 0}, {"totalChunks": 11}, {"contracts": None}):
+        with pytest.raises(ValueError):
+            assembler.add({**pages[0], **bad})
+    assert assembler.droppedTransfers == 4
+    assert assembler.pendingTransfers == 0
+
+
+def test_client_survives_invalid_pages():
+    pages, lists = [], []
+    client = WebSocketClient(logger=logger, name="ChunkClient")
+    client.registerChunkHandlers({Channel.Data.Contracts: pages.append})
+    client.registerMessageHandlers({Channel.Data.Contracts: lists.append})
+    chunks = [
+        json.loads(c.model_dump_json())
+        for c in QualifiedContractList.createChunks(contracts(2), chunkSize=1)
+    ]
+
+    async def main():
+        await client._dispatch({**chunks[0], "chunkIndex": 5})
+        await client._dispatch({**chunks[0], "chunkIndex": 7, "contracts": "garbage"})
+        for chunk in chunks:
+            await client._dispatch(chunk)
+
+    asyncio.run(main())
+    # Page handlers only ever see valid pages
+    assert pages == chunks
+    assert len(lists) == 1
+
+
+def test_client_hands_pages_and_assembled_list_to_handlers():
+    pages, lists = [], []
+    client = WebSocketClient(logger=logger, name="ChunkClient")
+    client.registerChunkHandlers({Channel.Data.Contracts: pages.append})
+    client.registerMessageHandlers({Channel.Data.Contracts: lists.append})
+
+    async def main():
+        for chunk in QualifiedContractList.createChunks(contracts(5), chunkSize=2):
+            await client._dispatch(json.loads(chunk.model_dump_json()))
+
+    asyncio.run(main())
+    assert [QualifiedContractChunk(**p).chunkIndex for p in pages] == [0, 1, 2]
+    assert len(lists) == 1
+    assert len(QualifiedContractList(**lists[0]).contracts) == 5
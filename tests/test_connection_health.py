@@ -0,0 +1,90 @@
+import asyncio
+from jgib.websocket import (
+    WebSocketClient,
+    WebSocketServer,
+    Channel,
+    FlowControlConfig,
+    TickerDto,
+    TickerList,
+)
+from jgmd.logging import FreeTextLogger, LogLevel
+
+logger = FreeTextLogger("./logs", "debug.log", LogLevel.INFO, printToConsole=False)
+token = "test_secret"
+
+
+def test_unresponsive_subscriber_is_evicted_and_rtt_is_tracked():
+    async def main():
+        server = WebSocketServer(
+            logger,
+            secretToken=token,
+            maxMessagesPerMinute=10,
+            pingInterval=0.1,
+            pingTimeout=0.2,
+        )
+        serverTask = asyncio.create_task(server.start("localhost", 8772))
+        await asyncio.sleep(0.2)
+        healthy = WebSocketClient(logger=logger, name="Healthy", pingInterval=0.1)
+        halfOpen = WebSocketClient(logger=logger, name="HalfOpen", pingInterval=None)
+        try:
+            await healthy.connect("ws://localhost:8772", token=token)
+            await halfOpen.connect("ws://localhost:8772", token=token)
+            healthy.registerMessageHandlers({})
+            await healthy.subscribeToChannel(Channel.Data.Tickers)
+            await halfOpen.subscribeToChannel(Channel.Data.Tickers)
+            await asyncio.sleep(0.1)
+            # Stop reading: pings from the server go unanswered, as with a dead peer
+            halfOpen._websocket.transport.pause_reading()
+            await asyncio.sleep(0.8)
+            subscribers = {
+                server.client_names.get(c)
+                for c in server.channel_subscriptions[Channel.Data.Tickers.value]
+            }
+            return subscribers, server.health_snapshot(), healthy.healthSnapshot()
+        finally:
+            await healthy.close()
+            serverTask.cancel()
+
+    subscribers, serverHealth, clientHealth = asyncio.run(main())
+    assert subscribers == {"Healthy"}
+    assert serverHealth["evictions"] == 1
+    assert serverHealth["lastEvicted"] == "HalfOpen"
+    (healthyStats,) = serverHealth["connections"]
+    assert healthyStats["name"] == "Healthy"
+    assert healthyStats["pongsReceived"] > 0
+    assert healthyStats["averageRtt"] < 0.2
+    assert clientHealth["connections"][0]["lastRtt"] is not None
+
+
+def test_throttled_publisher_with_paused_reads_is_not_evicted():
+    async def main():
+        server = WebSocketServer(
+            logger,
+            secretToken=token,
+            maxMessagesPerMinute=2,
+            flowControl=FlowControlConfig(
+                maxQueuedFrames=4, disconnectAfterSeconds=120
+            ),
+            pingInterval=0.3,
+            pingTimeout=0.3,
+        )
+        serverTask = asyncio.create_task(server.start("localhost", 8782))
+        await asyncio.sleep(0.2)
+        publisher = WebSocketClient(logger=logger, name="Publisher")
+        try:
+            await publisher.connect("ws://localhost:8782", token=token)
+            frame = TickerList.create([TickerDto(conId=1, symbol="A", last=1.0)])
+            # Far over budget: the server fills the inbox and stops reading
+            for _ in range(40):
+                await publisher.send(frame)
+            await asyncio.sleep(1.5)
+            return server.health_snapshot(), set(server.client_names.values())
+        finally:
+            # The server isn't reading, so a closing handshake would only time out
+            publisher._websocket.transport.abort()
+            await publisher.close()
+            serverTask.cancel()
+
+    health, clients = asyncio.run(main())
+    assert health["evictions"] == 0
+    assert clients == {"Publisher"}
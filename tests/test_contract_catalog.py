@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+from jgib.websocket.models import QualifiedContractDto, QualifiedContractList
+from jgib.websocket.services.contractCatalog import ContractCatalog
+
+CONTRACTS = [
+    QualifiedContractDto(
+        conId=1,
+        symbol="ES",
+        secType="FUT",
+        exchange="CME",
+        multiplier=50,
+        watchlist="futures",
+    ),
+    QualifiedContractDto(
+        conId=2,
+        symbol="NQ",
+        secType="FUT",
+        exchange="CME",
+        multiplier=20,
+        watchlist="futures",
+    ),
+    QualifiedContractDto(
+        conId=3, symbol="ES", secType="OPT", exchange="CME", tickSize=0.25
+    ),
+]
+
+
+def assert_lookups(catalog):
+    assert catalog.get(2) == CONTRACTS[1]
+    assert catalog.get(99) is None
+    assert catalog.bySymbol("ES") == [CONTRACTS[0], CONTRACTS[2]]
+    assert catalog.bySecType("OPT") == [CONTRACTS[2]]
+    assert catalog.byWatchlist("futures") == CONTRACTS[:2]
+    assert catalog.byWatchlist("none") == []
+    assert len(catalog) == 3
+    assert 3 in catalog
+
+
+def test_catalog_lookups_from_message():
+    message = json.loads(QualifiedContractList.create(CONTRACTS).model_dump_json())
+    catalog = ContractCatalog.fromMessage(message)
+    assert catalog.isCurrent(QualifiedContractList.computeVersion(CONTRACTS))
+    assert_lookups(catalog)
+
+
+def test_catalog_round_trips_through_file():
+    path = os.path.join(tempfile.mkdtemp(), "contracts.cat")
+    assert ContractCatalog.load(path) is None
+    ContractCatalog.fromContracts(CONTRACTS, version="v1").save(path)
+
+    catalog = ContractCatalog.load(path)
+    try:
+        assert catalog.isCurrent("v1")
+        assert not catalog.isCurrent("v2")
+        assert_lookups(catalog)
+        assert sorted(c.conId for c in catalog) == [1, 2, 3]
+    finally:
+        catalog.close()
+    assert catalog.get(1) == CONTRACTS[0]
+
+
+def test_load_rejects_other_files():
+    path = os.path.join(tempfile.mkdtemp(), "contracts.cat")
+    with open(path, "wb") as file:
+        file.write(b"not a catalog")
+    assert ContractCatalog.load(path) is None
+    open(path, "wb").close()
+    assert ContractCatalog.load(path) is None
+
+
+def test_load_rejects_truncated_files():
+    path = os.path.join(tempfile.mkdtemp(), "contracts.cat")
+    ContractCatalog.fromContracts(CONTRACTS, version="v1").save(path)
+    size = os.path.getsize(path)
+    for length in (30, size - 5):
+        os.truncate(path, length)
+        assert ContractCatalog.load(path) is None
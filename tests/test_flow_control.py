@@ -0,0 +1,144 @@
+import asyncio
+import json
+import math
+import websockets
+from collections import deque
+from websockets.protocol import State
+from jgib.websocket import (
+    WebSocketClient,
+    WebSocketServer,
+    Channel,
+    TickerDto,
+    TickerList,
+)
+from jgib.websocket.services.flowControl import (
+    ChannelBudget,
+    FlowControlConfig,
+    FlowController,
+    SlidingWindow,
+    shedOldestDataFrame,
+)
+from jgmd.logging import FreeTextLogger, LogLevel
+
+logger = FreeTextLogger("./logs", "debug.log", LogLevel.INFO, printToConsole=False)
+token = "test_secret"
+
+
+def test_sliding_window_message_and_byte_budgets():
+    window = SlidingWindow(maxMessages=2, maxBytes=100, windowSeconds=60)
+    assert window.delay(0, 40) == 0
+    window.record(0, 40)
+    window.record(10, 40)
+    # Message budget: the entry at t=0 must expire
+    assert window.delay(20, 10) == 40
+    # Byte budget beyond both entries: the entry at t=10 must expire too
+    window.maxMessages = None
+    assert window.delay(20, 90) == 50
+    assert math.isinf(window.delay(20, 101))
+    assert window.delay(70, 60) == 0
+
+
+def test_flow_controller_applies_channel_budgets_per_client():
+    now = [0.0]
+    controller = FlowController(
+        FlowControlConfig(
+            maxMessagesPerMinute=100,
+            channelBudgets={"dat@tickers": ChannelBudget(maxBytesPerMinute=10)},
+        ),
+        clock=lambda: now[0],
+    )
+    controller.record("a", "dat@tickers", 10)
+    assert controller.delay("a", "dat@tickers", 1) == 60
+    assert controller.delay("a", "cmd@ibClient", 1) == 0
+    assert controller.delay("b", "dat@tickers", 1) == 0
+    controller.removeClient("a")
+    assert controller.delay("a", "dat@tickers", 1) == 0
+
+
+def test_shed_oldest_data_frame_skips_control_messages():
+    inbox = deque(
+        [
+            ("1", {"action": "Subscribe", "channel": "dat@tickers"}),
+            ("2", {"channel": "cmd@ibClient"}),
+            ("3", {"channel": "dat@tickers"}),
+            ("4", {"channel": "dat@tickers"}),
+        ]
+    )
+    assert shedOldestDataFrame(inbox)
+    assert [m for m, _ in inbox] == ["1", "2", "4"]
+    inbox = deque([("1", {"channel": "cmd@ibClient"})])
+    assert not shedOldestDataFrame(inbox)
+
+
+def test_over_budget_publisher_is_throttled_not_disconnected():
+    async def main():
+        server = WebSocketServer(
+            logger,
+            secretToken=token,
+            maxMessagesPerMinute=3,
+            flowControl=FlowControlConfig(),
+        )
+        serverTask = asyncio.create_task(server.start("localhost", 8771))
+        await asyncio.sleep(0.2)
+        received = []
+        subscriber = WebSocketClient(logger=logger, name="Subscriber")
+        publisher = WebSocketClient(logger=logger, name="Publisher")
+        try:
+            await subscriber.connect("ws://localhost:8771", token=token)
+            await publisher.connect("ws://localhost:8771", token=token)
+            subscriber.registerMessageHandlers({Channel.Data.Tickers: received.append})
+            await subscriber.subscribeToChannel(Channel.Data.Tickers)
+            await asyncio.sleep(0.1)
+            ticker = TickerList.create([TickerDto(conId=1, symbol="TSLA", last=1.0)])
+            for _ in range(5):
+                await publisher.send(ticker)
+            await asyncio.sleep(0.3)
+            return (
+                len(received),
+                publisher._websocket.state,
+                server.flow_controller.stats(),
+            )
+        finally:
+            await subscriber.close()
+            await publisher.close()
+            serverTask.cancel()
+
+    receivedCount, state, stats = asyncio.run(main())
+    assert receivedCount == 3
+    assert state == State.OPEN
+    assert stats["throttleEvents"] == 1
+    assert stats["disconnects"] == 0
+
+
+def test_frames_over_the_byte_budget_are_shed_or_rejected():
+    async def main():
+        server = WebSocketServer(
+            logger,
+            secretToken=token,
+            maxMessagesPerMinute=100,
+            flowControl=FlowControlConfig(maxBytesPerMinute=300),
+        )
+        serverTask = asyncio.create_task(server.start("localhost", 8788))
+        await asyncio.sleep(0.2)
+        bigTickers = TickerList.create(
+            [TickerDto(conId=i, symbol="A", last=1.0) for i in range(20)]
+        ).model_dump_json()
+        bigSubscription = json.dumps(
+            {"action": "subscribe", "channel": "dat@" + "x" * 400}
+        )
+        try:
+            async with websockets.connect(
+                f"ws://localhost:8788?token={token}&name=Publisher"
+            ) as publisher:
+                await publisher.send(bigTickers)
+                await publisher.send(bigSubscription)
+                reply = json.loads(await asyncio.wait_for(publisher.recv(), 2))
+                return reply, server.flow_controller.stats(), publisher.state
+        finally:
+            serverTask.cancel()
+
+    reply, stats, state = asyncio.run(main())
+    assert "exceeds the byte budget" in reply["error"]
+    assert stats["shedFrames"] == 1
+    assert stats["rejectedFrames"] == 1
+    assert state == State.OPEN
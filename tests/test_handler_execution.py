@@ -0,0 +1,187 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from jgib.websocket import (
+    Channel,
+    ExecutionMode,
+    HandlerExecutor,
+    MessageHandler,
+    QualifiedContractDto,
+    QualifiedContractList,
+    TickerDto,
+    TickerList,
+    WebSocketClient,
+)
+from jgmd.logging import FreeTextLogger, LogLevel
+
+logger = FreeTextLogger("./logs", "debug.log", LogLevel.INFO, printToConsole=False)
+
+
+def _threadAndLast(data):
+    time.sleep(0.01)
+    return threading.get_ident(), data["tickers"][0]["last"]
+
+
+def _processAndConId(data):
+    return os.getpid(), data["tickers"][0]["conId"]
+
+
+def _contractCount(data):
+    return len(data["contracts"])
+
+
+def _tickers(i: int) -> str:
+    return TickerList.create(
+        [TickerDto(conId=i, symbol="A", last=float(i))]
+    ).model_dump_json()
+
+
+def test_thread_handlers_run_off_the_loop_in_order():
+    results = []
+
+    async def main():
+        client = WebSocketClient(logger=logger, name="Thread")
+        client.registerMessageHandlers(
+            {
+                Channel.Data.Tickers: MessageHandler(
+                    _threadAndLast, ExecutionMode.THREAD, onResult=results.append
+                )
+            }
+        )
+        for i in range(20):
+            await client._dispatch(json.loads(_tickers(i)))
+        await client.drainHandlers()
+        await client.close()
+
+    asyncio.run(main())
+    assert [last for _, last in results] == [float(i) for i in range(20)]
+    assert threading.get_ident() not in {thread for thread, _ in results}
+
+
+def test_process_handlers_receive_the_raw_frame():
+    results = []
+
+    async def main():
+        executor = HandlerExecutor(lambda channel, e: None, processPoolWorkers=2)
+        policy = MessageHandler(
+            _processAndConId, ExecutionMode.PROCESS, onResult=results.append
+        )
+        for i in range(5):
+            await executor.run(policy, Channel.Data.Tickers.value, raw=_tickers(i))
+        await executor.drain()
+        executor.shutdown()
+
+    asyncio.run(main())
+    assert [conId for _, conId in results] == list(range(5))
+    assert os.getpid() not in {pid for pid, _ in results}
+
+
+def test_in_flight_cap_applies_backpressure():
+    running = []
+    peak = []
+
+    def slow(data):
+        running.append(1)
+        peak.append(len(running))
+        time.sleep(0.02)
+        running.pop()
+
+    async def main():
+        executor = HandlerExecutor(lambda channel, e: None, maxInFlight=2)
+        policy = MessageHandler(slow, ExecutionMode.THREAD, ordered=False)
+        start = time.perf_counter()
+        for i in range(6):
+            await executor.run(policy, "dat@tickers", {"i": i})
+        queued = time.perf_counter() - start
+        await executor.drain()
+        executor.shutdown()
+        return queued
+
+    queued = asyncio.run(main())
+    assert max(peak) <= 2
+    # The last sends had to wait for earlier handlers to finish
+    assert queued >= 0.03
+
+
+def test_close_handles_pending_messages_and_stops_the_pools():
+    results = []
+
+    async def main():
+        client = WebSocketClient(logger=logger, name="Closing")
+        client.registerMessageHandlers(
+            {
+                Channel.Data.Tickers: MessageHandler(
+                    _threadAndLast, ExecutionMode.THREAD, onResult=results.append
+                )
+            }
+        )
+        for i in range(5):
+            await client._dispatch(json.loads(_tickers(i)))
+        await client.close()
+        return client._handlerExecutor._threadPool
+
+    assert asyncio.run(main()) is None
+    assert len(results) == 5
+
+
+def test_process_handlers_get_chunked_transfers_reassembled():
+    results = []
+    pages = [
+        chunk.model_dump_json()
+        for chunk in QualifiedContractList.createChunks(
+            [
+                QualifiedContractDto(conId=i, symbol="A", secType="OPT", exchange="X")
+                for i in range(5)
+            ],
+            chunkSize=2,
+        )
+    ]
+
+    async def frames():
+        for page in pages:
+            yield page
+
+    async def main():
+        client = WebSocketClient(logger=logger, name="Chunks")
+        client.registerMessageHandlers(
+            {
+                Channel.Data.Contracts: MessageHandler(
+                    _contractCount, ExecutionMode.PROCESS, onResult=results.append
+                )
+            }
+        )
+        client._websocket = frames()
+        await client._receive()
+        client._websocket = None
+        await client.close()
+
+    asyncio.run(main())
+    assert results == [5]
+
+
+def test_handler_errors_are_reported():
+    errors = []
+
+    def failing(data):
+        raise RuntimeError("boom")
+
+    async def main():
+        executor = HandlerExecutor(lambda channel, e: errors.append((channel, e)))
+        await executor.run(
+            MessageHandler(failing, ExecutionMode.THREAD), "dat@tickers", {}
+        )
+        await executor.drain()
+        executor.shutdown()
+
+    asyncio.run(main())
+    assert errors[0][0] == "dat@tickers"
+    assert isinstance(errors[0][1], RuntimeError)
+
+
+def test_peek_channel():
+    from jgib.websocket.services.handlerExecution import peekChannel
+
+    assert peekChannel(_tickers(1)) == Channel.Data.Tickers.value
+    assert peekChannel('{"action":"subscribe","channel":"dat@tickers"}') is None
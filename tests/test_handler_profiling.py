@@ -0,0 +1,77 @@
+import asyncio
+import time
+from jgib.websocket import Channel, ProfilingConfig, WebSocketClient
+from jgib.websocket.services.handlerProfiling import HandlerProfiler, LatencyHistogram
+from jgmd.logging import FreeTextLogger, LogLevel
+
+logger = FreeTextLogger("./logs", "debug.log", LogLevel.INFO, printToConsole=False)
+TICKERS = Channel.Data.Tickers.value
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for _ in range(98):
+        histogram.record(0.0002)
+    histogram.record(0.03)
+    histogram.record(3.0)
+    stats = histogram.toDict()
+    assert stats["count"] == 100
+    assert stats["p50"] == 0.00025
+    assert stats["p99"] == 0.05
+    assert stats["max"] == 3.0
+    assert stats["buckets"] == {"0.00025": 98, "0.05": 1, "5.0": 1}
+    assert LatencyHistogram().percentile(0.5) is None
+
+
+def test_profiler_counts_slow_calls_per_channel():
+    profiler = HandlerProfiler(ProfilingConfig(slowHandlerSeconds=0.01))
+    assert not profiler.record(TICKERS, 0.001)
+    assert profiler.record(TICKERS, 0.02)
+    handlers = profiler.snapshot()["handlers"]
+    assert handlers[TICKERS]["count"] == 2
+    assert handlers[TICKERS]["slowCalls"] == 1
+
+
+def test_client_profiles_handlers_and_event_loop_lag():
+    def slowHandler(data):
+        time.sleep(0.03)  # Blocks the event loop
+
+    async def main():
+        client = WebSocketClient(
+            logger=logger,
+            name="Profiled",
+            profiling=ProfilingConfig(
+                slowHandlerSeconds=0.02,
+                loopLagIntervalSeconds=0.01,
+                slowLoopLagSeconds=0.02,
+            ),
+        )
+        client.registerMessageHandlers(
+            {TICKERS: slowHandler, Channel.Event.IbClient: lambda data: None}
+        )
+        # Start the lag probe as connect() would
+        client._profilerTask = asyncio.create_task(
+            client._profiler.runLoopLagProbe(client._onSlowLoopLag)
+        )
+        await asyncio.sleep(0.05)
+        for _ in range(3):
+            await client._dispatch({"channel": TICKERS})
+            await asyncio.sleep(0.02)
+        await client._dispatch({"channel": Channel.Event.IbClient.value})
+        snapshot = client.profilingSnapshot()
+        await client.close()
+        return snapshot
+
+    snapshot = asyncio.run(main())
+    tickers = snapshot["handlers"][TICKERS]
+    assert tickers["count"] == 3
+    assert tickers["slowCalls"] == 3
+    assert tickers["p50"] >= 0.025
+    assert snapshot["handlers"][Channel.Event.IbClient.value]["slowCalls"] == 0
+    assert snapshot["loopLag"]["max"] >= 0.02
+
+
+def test_profiling_is_off_by_default():
+    client = WebSocketClient(logger=logger, name="Plain")
+    assert client.profilingSnapshot() == {}
+    assert client._handlerExecutor._onHandled is None
@@ -0,0 +1,42 @@
+import os
+import pytest
+from benchmarks.import_benchmark import PYDANTIC_BASELINE, measureImport
+
+# Cold-start budget for importing a model, as a multiple of importing pydantic itself in the same run, so the budget
+# holds on slow machines. Override with JGIB_IMPORT_BUDGET_RATIO.
+IMPORT_BUDGET_RATIO = float(os.environ.get("JGIB_IMPORT_BUDGET_RATIO", 3))
+
+
+def test_model_import_is_within_budget():
+    baseline, _ = measureImport(PYDANTIC_BASELINE, runs=3)
+    ms, _ = measureImport("from jgib.websocket.models import TickerList", runs=3)
+    assert ms < IMPORT_BUDGET_RATIO * baseline
+
+
+def test_models_package_import_skips_pydantic():
+    baseline, _ = measureImport(PYDANTIC_BASELINE, runs=3)
+    ms, modules = measureImport("import jgib.websocket.models", runs=3)
+    assert "pydantic" not in modules
+    assert ms < baseline
+
+
+@pytest.mark.parametrize(
+    "statement",
+    ["from jgib.websocket.models import TickerList", "import jgib.websocket"],
+)
+def test_model_only_imports_do_not_load_websockets_or_jgmd(statement):
+    _, modules = measureImport(statement, runs=1)
+    assert "websockets" not in modules
+    assert "jgmd" not in modules
+
+
+def test_lazy_exports_resolve():
+    import jgib
+    from jgib.websocket import TickerList, WebSocketServer
+    from jgib.websocket.models.data import TickerList as DataTickerList
+
+    assert TickerList is DataTickerList
+    assert WebSocketServer.__name__ == "WebSocketServer"
+    assert "TickerDto" in dir(jgib.websocket)
+    with pytest.raises(AttributeError):
+        jgib.websocket.DoesNotExist
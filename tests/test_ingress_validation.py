@@ -0,0 +1,132 @@
+import asyncio
+import json
+import pytest
+from pydantic import ValidationError
+from jgib.websocket import (
+    Channel,
+    IngressValidationConfig,
+    QualifiedContractDto,
+    QualifiedContractList,
+    TickerDto,
+    TickerList,
+    ValidationMode,
+    ValidationPolicy,
+    WebSocketClient,
+    WebSocketServer,
+)
+from jgib.websocket.services.ingressValidation import IngressValidator
+from jgmd.logging import FreeTextLogger, LogLevel
+
+logger = FreeTextLogger("./logs", "debug.log", LogLevel.INFO, printToConsole=False)
+token = "test_secret"
+TICKERS = Channel.Data.Tickers.value
+VALID = TickerList.create([TickerDto(conId=1, symbol="A", last=1.0)]).model_dump_json()
+INVALID = json.dumps({"channel": TICKERS, "tickers": [{"conId": "x"}]})
+
+
+def _validator(mode: ValidationMode, **policy) -> IngressValidator:
+    return IngressValidator(
+        IngressValidationConfig(
+            channelPolicies={TICKERS: ValidationPolicy(mode=mode, **policy)}
+        )
+    )
+
+
+def _rejects(validator: IngressValidator, publisher: str, message: str) -> bool:
+    try:
+        validator.validate(publisher, publisher, TICKERS, message)
+        return False
+    except ValidationError:
+        return True
+
+
+def test_full_validation_rejects_and_counts():
+    validator = _validator(ValidationMode.FULL)
+    assert not _rejects(validator, "a", VALID)
+    assert _rejects(validator, "a", INVALID)
+    assert _rejects(validator, "b", INVALID)
+    stats = validator.stats()
+    assert stats["validated"] == {TICKERS: 3}
+    assert stats["rejected"] == {TICKERS: 2}
+    assert stats["rejectedByPublisher"] == {"a": 1, "b": 1}
+    assert stats["lastRejection"] == f"b on {TICKERS}"
+
+
+def test_sampled_validation_checks_every_nth_message():
+    validator = _validator(ValidationMode.SAMPLED, sampleEvery=3)
+    rejected = [_rejects(validator, "a", INVALID) for _ in range(7)]
+    assert rejected == [True, False, False, True, False, False, True]
+
+
+def test_first_per_publisher_trusts_after_a_valid_message():
+    validator = _validator(ValidationMode.FIRST_PER_PUBLISHER)
+    assert _rejects(validator, "a", INVALID)
+    assert not _rejects(validator, "a", VALID)
+    assert not _rejects(validator, "a", INVALID)  # Trusted now
+    assert _rejects(validator, "b", INVALID)
+    validator.removePublisher("a")
+    assert _rejects(validator, "a", INVALID)
+
+
+def test_off_and_unknown_channels_are_not_validated():
+    validator = _validator(ValidationMode.OFF)
+    assert not _rejects(validator, "a", INVALID)
+    validator.validate("a", "a", "dat@unknown", INVALID)
+    assert validator.stats()["validated"] == {}
+
+
+def test_contract_pages_and_full_lists_are_accepted():
+    validator = IngressValidator(
+        IngressValidationConfig(
+            defaultPolicy=ValidationPolicy(mode=ValidationMode.FULL)
+        )
+    )
+    contracts = [
+        QualifiedContractDto(conId=i, symbol="A", secType="STK", exchange="SMART")
+        for i in range(3)
+    ]
+    channel = Channel.Data.Contracts.value
+    validator.validate(
+        "a", "a", channel, QualifiedContractList.create(contracts).model_dump_json()
+    )
+    for chunk in QualifiedContractList.createChunks(contracts, chunkSize=2):
+        validator.validate("a", "a", channel, chunk.model_dump_json())
+    with pytest.raises(ValidationError):
+        validator.validate("a", "a", channel, json.dumps({"channel": channel}))
+
+
+def test_server_drops_invalid_messages_before_broadcasting():
+    async def main():
+        server = WebSocketServer(
+            logger,
+            secretToken=token,
+            maxMessagesPerMinute=100,
+            ingressValidation=IngressValidationConfig(
+                channelPolicies={TICKERS: ValidationPolicy(mode=ValidationMode.FULL)}
+            ),
+        )
+        serverTask = asyncio.create_task(server.start("localhost", 8773))
+        await asyncio.sleep(0.2)
+        received = []
+        subscriber = WebSocketClient(logger=logger, name="Subscriber")
+        publisher = WebSocketClient(logger=logger, name="BadPublisher")
+        try:
+            await subscriber.connect("ws://localhost:8773", token=token)
+            await publisher.connect("ws://localhost:8773", token=token)
+            subscriber.registerMessageHandlers({Channel.Data.Tickers: received.append})
+            publisher.registerMessageHandlers({})
+            await subscriber.subscribeToChannel(Channel.Data.Tickers)
+            await asyncio.sleep(0.1)
+            await publisher._websocket.send(INVALID)
+            await publisher._websocket.send(VALID)
+            await asyncio.sleep(0.3)
+            return received, server.validation_stats()
+        finally:
+            await subscriber.close()
+            await publisher.close()
+            serverTask.cancel()
+
+    received, stats = asyncio.run(main())
+    assert [data["tickers"][0]["conId"] for data in received] == [1]
+    assert stats["rejected"] == {TICKERS: 1}
+    assert stats["rejectedByPublisher"] == {"BadPublisher": 1}
@@ -0,0 +1,60 @@
+import os
+import pytest
+from pydantic import BaseModel
+import jgib.websocket.models as models
+from benchmarks import model_benchmark
+
+
+def test_every_model_has_a_benchmark_case():
+    modelNames = {
+        name
+        for name in models.__all__
+        if isinstance(getattr(models, name), type)
+        and issubclass(getattr(models, name), BaseModel)
+        and name != "MessageDto"
+    }
+    assert modelNames == set(model_benchmark.CASES)
+    assert all(
+        any(key.startswith(f"{name}/") for key in model_benchmark.loadBaseline())
+        for name in modelNames
+    )
+
+
+def test_every_case_runs():
+    results = model_benchmark.run(sizes=[1], repeat=1)
+    assert len(results) == len(model_benchmark.CASES) * 4
+    assert all(r["seconds"] > 0 and r["peakBytes"] > 0 for r in results.values())
+
+
+def test_compare_flags_only_regressions_past_threshold():
+    baseline = {
+        "A/1/x": {"seconds": 0.010, "peakBytes": 1_000_000},
+        "B/1/x": {"seconds": 0.010, "peakBytes": 1_000_000},
+        "C/1/x": {"seconds": 0.00001, "peakBytes": 100},
+    }
+    results = {
+        "A/1/x": {"seconds": 0.012, "peakBytes": 1_100_000},  # Within 25%
+        "B/1/x": {"seconds": 0.020, "peakBytes": 2_000_000},  # Both regressed
+        "C/1/x": {"seconds": 0.00004, "peakBytes": 400},  # Relative, but noise
+        "D/1/x": {"seconds": 1.0, "peakBytes": 1},  # No baseline
+    }
+    regressions = model_benchmark.compare(results, baseline, threshold=0.25)
+    assert [r.split()[:2] for r in regressions] == [
+        ["B/1/x", "seconds:"],
+        ["B/1/x", "peakBytes:"],
+    ]
+
+
+@pytest.mark.skipif(
+    not os.environ.get("JGIB_RUN_BENCHMARKS"),
+    reason="Set JGIB_RUN_BENCHMARKS=1 to compare against the stored baseline",
+)
+def test_no_regressions_against_baseline():
+    results = model_benchmark.run()
+    regressions = model_benchmark.check(
+        results,
+        model_benchmark.loadBaseline(),
+        model_benchmark.DEFAULT_THRESHOLD,
+        repeat=5,
+    )
+    assert not regressions, "\n".join(regressions)
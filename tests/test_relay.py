@@ -0,0 +1,265 @@
+import asyncio
+import pytest
+import websockets
+from websockets.protocol import State
+from jgib.websocket import (
+    Channel,
+    FlowControlConfig,
+    IbClientCommandDto,
+    IbClientCommandType,
+    RelayConfig,
+    TickerDto,
+    TickerList,
+    WebSocketClient,
+    WebSocketServer,
+)
+from jgib.websocket.services.relay import UpstreamRelay
+from jgmd.logging import FreeTextLogger, LogLevel
+
+logger = FreeTextLogger("./logs", "debug.log", LogLevel.INFO, printToConsole=False)
+token = "test_secret"
+relayToken = "test_relay_secret"
+
+
+def _server(nodeId: str, upstreamPort=None) -> WebSocketServer:
+    upstream = (
+        RelayConfig(
+            uri=f"ws://localhost:{upstreamPort}",
+            token=relayToken,
+            reconnectSeconds=0.1,
+        )
+        if upstreamPort
+        else None
+    )
+    return WebSocketServer(
+        logger,
+        secretToken=token,
+        maxMessagesPerMinute=1000,
+        upstream=upstream,
+        nodeId=nodeId,
+        relayToken=relayToken,
+    )
+
+
+def _subscriberNames(server: WebSocketServer, channel: Channel) -> set:
+    return {
+        server.client_names.get(c)
+        for c in server.channel_subscriptions.get(channel.value, ())
+    }
+
+
+def test_relay_chain_propagates_subscriptions_and_fans_out():
+    async def main():
+        root, middle, edge = (
+            _server("root"),
+            _server("middle", 8775),
+            _server("edge", 8776),
+        )
+        tasks = [asyncio.create_task(root.start("localhost", 8775))]
+        await asyncio.sleep(0.1)
+        tasks.append(asyncio.create_task(middle.start("localhost", 8776)))
+        await asyncio.sleep(0.1)
+        tasks.append(asyncio.create_task(edge.start("localhost", 8777)))
+        await asyncio.sleep(0.3)
+        received = {"edge1": [], "edge2": [], "middle": []}
+        commands = []
+        clients = {
+            name: WebSocketClient(logger=logger, name=name)
+            for name in ("edge1", "edge2", "middle", "ibClient")
+        }
+        try:
+            for name, port in (
+                ("edge1", 8777),
+                ("edge2", 8777),
+                ("middle", 8776),
+                ("ibClient", 8775),
+            ):
+                await clients[name].connect(f"ws://localhost:{port}", token=token)
+            for name in received:
+                clients[name].registerMessageHandlers(
+                    {Channel.Data.Tickers: received[name].append}
+                )
+                await clients[name].subscribeToChannel(Channel.Data.Tickers)
+            clients["ibClient"].registerMessageHandlers(
+                {Channel.Command.IbClient: commands.append}
+            )
+            await clients["ibClient"].subscribeToChannel(Channel.Command.IbClient)
+            await asyncio.sleep(0.3)
+            subscribed = (
+                _subscriberNames(root, Channel.Data.Tickers),
+                _subscriberNames(middle, Channel.Data.Tickers),
+            )
+            await clients["ibClient"].send(
+                TickerList.create([TickerDto(conId=1, symbol="A", last=1.0)])
+            )
+            # A command published at the edge reaches the ibClient on the root
+            await clients["edge1"].send(
+                IbClientCommandDto(
+                    channel=Channel.Command.IbClient,
+                    command=IbClientCommandType.RESET_START_PRICES,
+                )
+            )
+            await asyncio.sleep(0.3)
+            for name in ("edge1", "edge2"):
+                await clients[name].close()
+            await asyncio.sleep(0.3)
+            withdrawn = (
+                _subscriberNames(root, Channel.Data.Tickers),
+                _subscriberNames(middle, Channel.Data.Tickers),
+            )
+            return subscribed, withdrawn, received, commands
+        finally:
+            for client in clients.values():
+                await client.close()
+            for task in tasks:
+                task.cancel()
+
+    subscribed, withdrawn, received, commands = asyncio.run(main())
+    # The root sends once per relay, not once per subscriber
+    assert subscribed == ({"relay:middle"}, {"relay:edge", "middle"})
+    assert {name: len(messages) for name, messages in received.items()} == {
+        "edge1": 1,
+        "edge2": 1,
+        "middle": 1,
+    }
+    assert len(commands) == 1
+    # Once the edge has no subscribers its upstream subscription is withdrawn
+    assert withdrawn == ({"relay:middle"}, {"middle"})
+
+
+def test_relay_loops_are_refused():
+    async def main():
+        first, second = _server("first", 8779), _server("second", 8778)
+        tasks = [asyncio.create_task(first.start("localhost", 8778))]
+        # second isn't listening yet, so first's relay keeps retrying until it is
+        await asyncio.sleep(0.3)
+        tasks.append(asyncio.create_task(second.start("localhost", 8779)))
+        await asyncio.sleep(0.6)
+        try:
+            return (
+                first.upstream_path,
+                second.upstream_path,
+                set(first.relay_clients.values()),
+                set(second.relay_clients.values()),
+            )
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    firstPath, secondPath, firstRelays, secondRelays = asyncio.run(main())
+    # Exactly one direction of the cycle is allowed
+    assert (firstPath, secondPath) in ((["second"], []), ([], ["first"]))
+    assert len(firstRelays) + len(secondRelays) == 1
+
+
+@pytest.mark.parametrize(
+    "flowControl, port",
+    [(None, 8783), (FlowControlConfig(maxQueuedFrames=2), 8785)],
+)
+def test_relays_are_exempt_from_upstream_limits(flowControl, port):
+    async def main():
+        root = WebSocketServer(
+            logger,
+            secretToken=token,
+            maxMessagesPerMinute=2,
+            flowControl=flowControl,
+            nodeId="root",
+            relayToken=relayToken,
+        )
+        edge = _server("edge", port)
+        tasks = [asyncio.create_task(root.start("localhost", port))]
+        await asyncio.sleep(0.1)
+        tasks.append(asyncio.create_task(edge.start("localhost", port + 1)))
+        await asyncio.sleep(0.3)
+        received = []
+        subscriber = WebSocketClient(logger=logger, name="subscriber")
+        publishers = [
+            WebSocketClient(logger=logger, name=f"publisher{i}") for i in range(3)
+        ]
+        try:
+            await subscriber.connect(f"ws://localhost:{port}", token=token)
+            subscriber.registerMessageHandlers(
+                {Channel.Data.Tickers: lambda data: received.extend(data["tickers"])}
+            )
+            await subscriber.subscribeToChannel(Channel.Data.Tickers)
+            # Each publisher stays within the root's limit; together they exceed it
+            for i, publisher in enumerate(publishers):
+                await publisher.connect(f"ws://localhost:{port + 1}", token=token)
+                await publisher.send(
+                    TickerList.create([TickerDto(conId=i, symbol="A", last=1.0)])
+                )
+            await asyncio.sleep(0.5)
+            return len(received), set(root.relay_clients.values())
+        finally:
+            for client in [subscriber] + publishers:
+                await client.close()
+            for task in tasks:
+                task.cancel()
+
+    count, relays = asyncio.run(main())
+    assert count == 3
+    assert relays == {"edge"}
+
+
+def test_messages_published_while_upstream_is_down_are_counted():
+    async def main():
+        async def onMessage(message, data):
+            pass
+
+        async def onPath(path):
+            return True
+
+        relay = UpstreamRelay(
+            RelayConfig(uri="ws://localhost:1", token=relayToken),
+            "edge",
+            logger,
+            onMessage,
+            onPath,
+        )
+        for _ in range(3):
+            relay.publish('{"channel":"cmd@ibClient"}')
+        return relay.droppedMessages
+
+    assert asyncio.run(main()) == 3
+
+
+def test_only_clients_with_the_relay_token_are_relays():
+    async def main():
+        server = WebSocketServer(
+            logger,
+            secretToken=token,
+            maxMessagesPerMinute=3,
+            nodeId="root",
+            relayToken=relayToken,
+        )
+        serverTask = asyncio.create_task(server.start("localhost", 8787))
+        await asyncio.sleep(0.1)
+        refused = []
+        try:
+            for relayNode, relayAuth in (("impostor", token), ("edge", None)):
+                query = (
+                    f"token={relayAuth}&name=relay:{relayNode}&relayNode={relayNode}"
+                )
+                try:
+                    async with websockets.connect(f"ws://localhost:8787?{query}"):
+                        pass
+                except websockets.exceptions.InvalidStatus as e:
+                    refused.append(e.response.status_code)
+            query = f"token={relayToken}&name=relay:edge&relayNode=edge"
+            async with websockets.connect(f"ws://localhost:8787?{query}") as relay:
+                for _ in range(10):
+                    await relay.send(
+                        TickerList.create(
+                            [TickerDto(conId=1, symbol="A", last=1.0)]
+                        ).model_dump_json()
+                    )
+                await asyncio.sleep(0.2)
+                return refused, relay.state, set(server.relay_clients.values())
+        finally:
+            serverTask.cancel()
+
+    refused, state, relays = asyncio.run(main())
+    assert refused == [401, 401]
+    # Over maxMessagesPerMinute, but a relay is not rate limited
+    assert state == State.OPEN
+    assert relays == {"edge"}
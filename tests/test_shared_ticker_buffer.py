@@ -0,0 +1,161 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import uuid
+import pytest
+from websockets.protocol import State
+from jgib.websocket import Channel, WebSocketClient, WebSocketServer
+from jgib.websocket.services.sharedTickerBuffer import SharedTickerBuffer
+from jgmd.logging import FreeTextLogger, LogLevel
+
+logger = FreeTextLogger("./logs", "debug.log", LogLevel.INFO, printToConsole=False)
+token = "test_secret"
+
+
+@pytest.fixture
+def writer():
+    buffer = SharedTickerBuffer.create(f"jgib_test_{uuid.uuid4().hex[:8]}", capacity=4)
+    yield buffer
+    buffer.close()
+
+
+def test_reader_sees_only_new_records(writer):
+    writer.write([{"conId": 1, "symbol": "OLD", "last": 1.0}])
+    reader = SharedTickerBuffer.attach(writer.name)
+    try:
+        assert reader.read() == []
+        writer.write(
+            [
+                {"conId": 1, "symbol": "AAPL", "last": 150.0, "startPrice": 149.0},
+                {"conId": 2, "symbol": "MSFT", "last": 300.0, "pctDeviation": 0.5},
+            ]
+        )
+        assert reader.read() == [
+            {
+                "conId": 1,
+                "symbol": "AAPL",
+                "last": 150.0,
+                "startPrice": 149.0,
+                "pctDeviation": None,
+            },
+            {
+                "conId": 2,
+                "symbol": "MSFT",
+                "last": 300.0,
+                "startPrice": None,
+                "pctDeviation": 0.5,
+            },
+        ]
+        assert reader.read() == []
+    finally:
+        reader.close()
+
+
+def test_reader_keeps_latest_per_con_id_and_survives_overrun(writer):
+    reader = SharedTickerBuffer.attach(writer.name)
+    try:
+        # 6 records into a 4-slot ring: the two oldest are overwritten
+        writer.write(
+            [{"conId": i % 2, "symbol": "X", "last": float(i)} for i in range(6)]
+        )
+        tickers = {t["conId"]: t["last"] for t in reader.read()}
+        assert tickers == {0: 4.0, 1: 5.0}
+    finally:
+        reader.close()
+
+
+def test_attach_missing_buffer_raises():
+    with pytest.raises(FileNotFoundError):
+        SharedTickerBuffer.attach(f"jgib_missing_{uuid.uuid4().hex[:8]}")
+
+
+def test_reader_process_exiting_leaves_the_buffer_in_place(writer):
+    writer.write([{"conId": 1, "symbol": "A", "last": 1.0}])
+    # The reader waits for its resource tracker to exit, so any cleanup it does has happened when run() returns
+    reader = (
+        "from multiprocessing import resource_tracker\n"
+        "from jgib.websocket.services.sharedTickerBuffer import SharedTickerBuffer\n"
+        f"SharedTickerBuffer.attach({writer.name!r}).close()\n"
+        "resource_tracker._resource_tracker._stop()\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", reader], cwd=root, check=True)
+    # The reader's resource tracker must not have unlinked the writer's segment
+    SharedTickerBuffer.attach(writer.name).close()
+
+
+def test_bad_records_are_skipped_and_sources_can_be_excluded(writer):
+    reader = SharedTickerBuffer.attach(writer.name)
+    try:
+        skipped = writer.write(
+            [
+                {"conId": 1, "symbol": "A"},  # No last
+                {"conId": "x", "last": 1.0},
+                {"conId": 2, "symbol": "B", "last": 2.0},
+            ],
+            source="publisher",
+        )
+        writer.write([{"conId": 3, "symbol": "C", "last": 3.0}], source="other")
+        assert skipped == 2
+        assert writer.skippedRecords == 2
+        assert [t["conId"] for t in reader.read(excludeSource="publisher")] == [3]
+    finally:
+        reader.close()
+
+
+def test_server_buffer_delivers_only_to_other_ticker_subscribers():
+    bufferName = f"jgib_test_{uuid.uuid4().hex[:8]}"
+    frame = json.dumps(
+        {
+            "channel": Channel.Data.Tickers.value,
+            "tickers": [
+                {"conId": 1, "symbol": "A"},
+                {"conId": 2, "symbol": "B", "last": 2.0},
+            ],
+        }
+    )
+
+    async def main():
+        server = WebSocketServer(
+            logger,
+            secretToken=token,
+            maxMessagesPerMinute=100,
+            sharedTickerBufferName=bufferName,
+        )
+        serverTask = asyncio.create_task(server.start("localhost", 8780))
+        await asyncio.sleep(0.2)
+        received = {"Publisher": [], "Subscriber": [], "Bystander": []}
+        clients = {name: WebSocketClient(logger=logger, name=name) for name in received}
+        try:
+            for name, client in clients.items():
+                await client.connect(
+                    "ws://localhost:8780",
+                    token=token,
+                    sharedTickerBufferName=bufferName,
+                )
+                client.registerMessageHandlers(
+                    {
+                        Channel.Data.Tickers: lambda data, into=received[
+                            name
+                        ]: into.extend(data["tickers"])
+                    }
+                )
+            for name in ("Publisher", "Subscriber"):
+                await clients[name].subscribeToChannel(Channel.Data.Tickers)
+            await asyncio.sleep(0.1)
+            await clients["Publisher"]._websocket.send(frame)
+            await asyncio.sleep(0.2)
+            return received, clients["Publisher"]._websocket.state
+        finally:
+            for client in clients.values():
+                await client.close()
+            serverTask.cancel()
+            await asyncio.sleep(0.1)
+
+    received, publisherState = asyncio.run(main())
+    assert publisherState == State.OPEN
+    assert [t["conId"] for t in received["Subscriber"]] == [2]
+    assert received["Publisher"] == []
+    assert received["Bystander"] == []
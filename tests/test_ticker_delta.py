@@ -0,0 +1,141 @@
+import asyncio
+import json
+import random
+from jgib.websocket import (
+    Channel,
+    TickerDeltaDecoder,
+    TickerDeltaEncoder,
+    TickerDeltaList,
+    TickerDeltaProcessor,
+    TickerDto,
+    TickerList,
+    WebSocketClient,
+    WebSocketServer,
+)
+from jgmd.logging import FreeTextLogger, LogLevel
+
+logger = FreeTextLogger("./logs", "debug.log", LogLevel.INFO, printToConsole=False)
+token = "test_secret"
+
+
+def _frames(count: int, size: int, changeFraction: float = 0.1):
+    """Ticker frames for a watchlist of size contracts where changeFraction of the prices move each frame."""
+    rng = random.Random(1)
+    prices = [100.0 + i for i in range(size)]
+    for _ in range(count):
+        for i in rng.sample(range(size), int(size * changeFraction)):
+            prices[i] += 0.01
+        yield [
+            TickerDto(
+                conId=i,
+                symbol=f"SYM{i}",
+                last=prices[i],
+                startPrice=100.0 + i,
+                pctDeviation=prices[i] / (100.0 + i) - 1,
+            )
+            for i in range(size)
+        ]
+
+
+def _wire(frame: TickerDeltaList) -> dict:
+    return json.loads(frame.model_dump_json())
+
+
+def test_decoder_rebuilds_full_tickers():
+    encoder = TickerDeltaEncoder(keyframeInterval=5)
+    decoder = TickerDeltaDecoder()
+    state = {}
+    for tickers in _frames(12, 50):
+        decoded = decoder.apply(_wire(encoder.encode(tickers)))
+        for ticker in decoded:
+            state[ticker["conId"]] = ticker
+        assert state == {t.conId: t.model_dump() for t in tickers}
+
+
+def test_unchanged_fields_and_contracts_are_not_sent():
+    encoder = TickerDeltaEncoder()
+    first = TickerDto(conId=1, symbol="A", last=1.0, startPrice=1.0)
+    second = TickerDto(conId=2, symbol="B", last=2.0, startPrice=2.0)
+    keyframe = _wire(encoder.encode([first, second]))
+    assert keyframe["keyframe"] and len(keyframe["tickers"]) == 2
+    delta = _wire(encoder.encode([first.model_copy(update={"last": 1.5}), second]))
+    assert not delta["keyframe"]
+    assert delta["tickers"] == [{"conId": 1, "last": 1.5}]
+
+
+def test_decoder_waits_for_a_keyframe_after_a_gap():
+    encoder = TickerDeltaEncoder(keyframeInterval=4)
+    frames = [_wire(encoder.encode(tickers)) for tickers in _frames(9, 10)]
+    decoder = TickerDeltaDecoder()
+    assert decoder.apply(frames[1]) is None  # Joined mid-stream
+    results = [decoder.apply(frame) for frame in frames[4:6] + frames[7:]]
+    assert [r is not None for r in results] == [True, True, False, True]
+    assert decoder.gaps == 1
+
+
+def test_malformed_records_do_not_break_the_stream():
+    processor = TickerDeltaProcessor(keyframeInterval=3)
+    decoder = TickerDeltaDecoder()
+    frames = [
+        [{"conId": 1, "last": 1.0}, {"conId": 2, "last": 2.0}],
+        [{"conId": 2, "last": "bad"}, {"conId": "3", "last": 3.0}, None, {"last": 1.0}],
+        [{"conId": 1, "last": 1.5}],
+        [{"conId": 1, "last": 1.5}],
+    ]
+    state = {}
+    for tickers in frames:
+        (frame,) = processor.process("dat@tickers", {"tickers": tickers}, 0.0)
+        for ticker in decoder.apply(_wire(frame)):
+            state[ticker["conId"]] = ticker
+    # The last frame is a keyframe; it must still build, with conId 2 unchanged
+    assert frame.keyframe
+    assert state == {
+        1: {"conId": 1, "last": 1.5},
+        2: {"conId": 2, "last": 2.0},
+    }
+    assert processor.skippedRecords == 4
+
+
+def test_deltas_are_several_times_smaller():
+    encoder = TickerDeltaEncoder(keyframeInterval=100)
+    fullBytes = deltaBytes = 0
+    for tickers in _frames(50, 1000):
+        fullBytes += len(TickerList.create(tickers).model_dump_json())
+        deltaBytes += len(encoder.encode(tickers).model_dump_json())
+    assert fullBytes / deltaBytes > 3
+
+
+def test_client_receives_full_tickers_from_server_deltas():
+    async def main():
+        server = WebSocketServer(
+            logger,
+            secretToken=token,
+            maxMessagesPerMinute=100,
+            processors=[TickerDeltaProcessor(keyframeInterval=10)],
+        )
+        serverTask = asyncio.create_task(server.start("localhost", 8774))
+        await asyncio.sleep(0.2)
+        received = []
+        subscriber = WebSocketClient(logger=logger, name="DeltaSubscriber")
+        publisher = WebSocketClient(logger=logger, name="Publisher")
+        try:
+            await subscriber.connect("ws://localhost:8774", token=token)
+            await publisher.connect("ws://localhost:8774", token=token)
+            subscriber.registerMessageHandlers(
+                {Channel.Data.Tickers: lambda data: received.extend(data["tickers"])}
+            )
+            await subscriber.subscribeToChannel(Channel.Data.TickerDeltas)
+            await asyncio.sleep(0.1)
+            frames = list(_frames(3, 20))
+            for tickers in frames:
+                await publisher.send(TickerList.create(tickers))
+            await asyncio.sleep(0.3)
+            return received, frames[-1]
+        finally:
+            await subscriber.close()
+            await publisher.close()
+            serverTask.cancel()
+
+    received, last = asyncio.run(main())
+    state = {ticker["conId"]: ticker for ticker in received}
+    assert state == {t.conId: t.model_dump() for t in last}
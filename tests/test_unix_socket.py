@@ -0,0 +1,44 @@
+import asyncio
+import os
+import tempfile
+from jgib.websocket import (
+    WebSocketClient,
+    WebSocketServer,
+    Channel,
+    TickerDto,
+    TickerList,
+)
+from jgmd.logging import FreeTextLogger, LogLevel
+
+logger = FreeTextLogger("./logs", "debug.log", LogLevel.INFO, printToConsole=False)
+token = "test_secret"
+
+
+def test_clients_exchange_messages_over_unix_socket():
+    async def main():
+        unixPath = os.path.join(tempfile.mkdtemp(), "jgib.sock")
+        server = WebSocketServer(logger, secretToken=token, maxMessagesPerMinute=10)
+        serverTask = asyncio.create_task(server.start(port=None, unixPath=unixPath))
+        await asyncio.sleep(0.2)
+        received = []
+        subscriber = WebSocketClient(logger=logger, name="UnixSubscriber")
+        publisher = WebSocketClient(logger=logger, name="UnixPublisher")
+        try:
+            await subscriber.connect("ws://localhost", token=token, unixPath=unixPath)
+            await publisher.connect("ws://localhost", token=token, unixPath=unixPath)
+            subscriber.registerMessageHandlers({Channel.Data.Tickers: received.append})
+            await subscriber.subscribeToChannel(Channel.Data.Tickers)
+            await asyncio.sleep(0.1)
+            await publisher.send(
+                TickerList.create([TickerDto(conId=1, symbol="TSLA", last=111.1)])
+            )
+            await asyncio.sleep(0.2)
+        finally:
+            await subscriber.close()
+            await publisher.close()
+            serverTask.cancel()
+        return received
+
+    received = asyncio.run(main())
+    assert len(received) == 1
+    assert TickerList(**received[0]).tickers[0].symbol == "TSLA"